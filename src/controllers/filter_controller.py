@@ -2,10 +2,10 @@ from PySide6.QtCore import QObject, QRunnable, Signal, QThreadPool, Qt
 from models.data_processor import DataProcessor
 from controllers.table_controller import TableController
 from ui.components.custom_combobox import SmartComboBox
-import pandas as pd
+from utils.column_types import ColumnTypes
 
 class FilterWorkerSignals(QObject):
-    finished = Signal(pd.DataFrame)
+    finished = Signal(object)  # Позиции строк (np.ndarray)
     error = Signal(str)
 
 class FilterWorker(QRunnable):
@@ -18,8 +18,8 @@ class FilterWorker(QRunnable):
 
     def run(self):
         try:
-            result_df = self.data_processor.filter_data(self.column, self.filter_text)
-            self.signals.finished.emit(result_df)
+            rows = self.data_processor.filter_rows(self.column, self.filter_text)
+            self.signals.finished.emit(rows)
         except Exception as e:
             self.signals.error.emit(str(e))
 
@@ -41,14 +41,9 @@ class FilterController(QObject):
         # Обновляем список колонок и делаем поле нередактируемым
         self.column_box.setup(columns, editable=False)
 
-    def is_numeric_column(self, values):
-        """Проверяет, являются ли значения числовыми (целыми или с плавающей точкой)."""
-        try:
-            # Если хотя бы 80% значений можно привести к числу — считаем колонку числовой
-            num_values = [float(v) for v in values if str(v).strip() != ""]
-            return len(num_values) >= 0.8 * len(values)
-        except Exception:
-            return False
+    def is_numeric_column(self, column_name: str) -> bool:
+        """Проверяет, является ли колонка числовой (целой или с плавающей точкой)."""
+        return self.data_processor.get_column_type(column_name) in ColumnTypes.NUMERIC
 
     def on_column_change(self, index: int):
         # Очищаем поле ключевых слов
@@ -63,7 +58,7 @@ class FilterController(QObject):
             values = self.table_controller.get_column_values(column_name)
             
             # Определяем, является ли колонка числовой
-            if self.is_numeric_column(values):
+            if self.is_numeric_column(column_name):
                 try:
                     # Обрабатываем числовые значения
                     numeric_values = sorted(
@@ -114,6 +109,8 @@ class FilterController(QObject):
             self.keyword_edit.clear()
 
     def apply_filter(self):
+        if self.table_controller.is_loading():
+            return
         if self.current_filter_worker is not None:
             self.current_filter_worker.signals.finished.disconnect()
             self.current_filter_worker = None
@@ -129,8 +126,8 @@ class FilterController(QObject):
         self.current_filter_worker = worker
         self.threadpool.start(worker)
 
-    def _on_filter_complete(self, result_df):
-        self.table_controller.set_filtered_dataframe(result_df)
+    def _on_filter_complete(self, rows):
+        self.table_controller.set_filtered_rows(rows)
         self.current_filter_worker = None
 
     def reset_all(self):
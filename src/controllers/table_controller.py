@@ -1,13 +1,54 @@
 from typing import List, Optional, Dict, Any
-from PySide6.QtCore import QObject, Qt
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Qt
 from PySide6.QtWidgets import QMessageBox, QPushButton
 from models.table_model import SmartTableModel
 from models.data_processor import DataProcessor
 from ui.components.table_view import SmartTableView
+from utils.column_types import ColumnTypes
+import numpy as np
 import pandas as pd
 import os
 
+class LoadWorkerSignals(QObject):
+    progress = Signal(str, int, int)  # Этап, обработано, всего
+    rows = Signal(object)  # Очередная прочитанная порция строк при потоковом чтении
+    finished = Signal(object)  # Результат DataProcessor.read_excel
+    error = Signal(str)
+
+class LoadWorker(QRunnable):
+    """Читает Excel-файл в фоновом потоке; текущая таблица при этом не меняется"""
+
+    def __init__(self, data_processor: DataProcessor, file_path: str):
+        super().__init__()
+        self.data_processor = data_processor
+        self.file_path = file_path
+        self.signals = LoadWorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        try:
+            result = self.data_processor.read_excel(
+                self.file_path,
+                progress=self.signals.progress.emit,
+                cancelled=self.is_cancelled,
+                on_rows=self.signals.rows.emit
+            )
+            # При отмене ничего не сообщаем: контроллер уже отключился от сигналов
+            if result is not None:
+                self.signals.finished.emit(result)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
 class TableController(QObject):
+    loadProgress = Signal(str, int, int)
+    loadFinished = Signal(bool)  # True — файл загружен, False — ошибка
+
     def __init__(self, view: SmartTableView):
         super().__init__()
         self.view = view
@@ -16,21 +57,113 @@ class TableController(QObject):
         self.num_mode = "excel"
         self.num_col_index = 0
         self.current_file_path = None
+        self.threadpool = QThreadPool()
+        self.current_load_worker: Optional[LoadWorker] = None
+        # Состояние до начала потоковой загрузки — восстанавливается при отмене или ошибке
+        self._state_before_loading: Optional[tuple] = None
 
     def load_file(self, file_path: str) -> bool:
         try:
             df, num_col_index = self.data_processor.load_excel(file_path)
-            self.num_col_index = num_col_index
-            self.num_mode = "excel"
-            self.model = SmartTableModel(df, self.num_mode, self.num_col_index)
-            self.view.setModel(self.model)
-            self.view.adjust_columns()
-            self.current_file_path = file_path
+            self._show_loaded_table(file_path, df, num_col_index)
             return True
         except Exception as e:
             print(f"Ошибка при загрузке файла: {e}")
             return False
 
+    def start_loading(self, file_path: str) -> None:
+        """Загружает файл в фоновом потоке; о ходе и результате сообщают loadProgress и loadFinished"""
+        self.cancel_loading()
+        worker = LoadWorker(self.data_processor, file_path)
+        worker.signals.progress.connect(self.loadProgress)
+        worker.signals.rows.connect(self._on_rows_loaded)
+        worker.signals.finished.connect(self._on_load_finished)
+        worker.signals.error.connect(self._on_load_error)
+        self.current_load_worker = worker
+        self.threadpool.start(worker)
+
+    def cancel_loading(self) -> None:
+        """Отменяет текущую загрузку; уже показанная таблица остается без изменений"""
+        if self.current_load_worker is None:
+            return
+        worker = self.current_load_worker
+        worker.cancel()
+        worker.signals.progress.disconnect()
+        worker.signals.rows.disconnect()
+        worker.signals.finished.disconnect()
+        worker.signals.error.disconnect()
+        self.current_load_worker = None
+        self._restore_state_before_loading()
+
+    def is_loading(self) -> bool:
+        """Идет фоновая загрузка: до ее окончания фильтры и правка записей недоступны"""
+        return self.current_load_worker is not None
+
+    def _on_rows_loaded(self, chunk: pd.DataFrame) -> None:
+        """Показывает прочитанную порцию строк, пока файл дочитывается"""
+        if self._state_before_loading is None:
+            self._state_before_loading = (self.model, self.num_col_index, self.num_mode, self.current_file_path)
+            # DataProcessor пока хранит прежнюю таблицу, поэтому ее ключи сортировки не подходят:
+            # до окончания загрузки сортируем по тексту прочитанных строк
+            self.model = SmartTableModel(chunk, "excel", self._streamed_num_col_index(chunk))
+            self.view.setModel(self.model)
+            self.view.adjust_columns()
+        else:
+            self.model.extend_rows(chunk)
+
+    def _streamed_num_col_index(self, df: pd.DataFrame) -> int:
+        if "Excel #" in df.columns:
+            return df.columns.get_loc("Excel #")
+        num_col_index = self.data_processor.text_processor.find_num_column(df.columns)
+        return 0 if num_col_index is None else num_col_index
+
+    def _restore_state_before_loading(self) -> None:
+        if self._state_before_loading is None:
+            return
+        self.model, self.num_col_index, self.num_mode, self.current_file_path = self._state_before_loading
+        self._state_before_loading = None
+        self.view.setModel(self.model)
+        if self.model is not None:
+            self.view.adjust_columns()
+
+    def _on_load_finished(self, result) -> None:
+        file_path = self.current_load_worker.file_path
+        self.current_load_worker = None
+        try:
+            df, num_col_index, num_column_added, column_store = result
+            # Подмена таблицы и модели происходит только в потоке интерфейса
+            self.data_processor.set_loaded_table(file_path, df, num_col_index, num_column_added, column_store)
+            if self._state_before_loading is not None:
+                # Строки уже показаны по мере чтения — модель остается, меняется только база
+                self._state_before_loading = None
+                self.num_col_index = num_col_index
+                self.num_mode = "excel"
+                self.current_file_path = file_path
+                self.model.sort_key_provider = self.data_processor.get_sort_key
+                self.model.replace_base(df)
+                self.view.adjust_columns()
+            else:
+                self._show_loaded_table(file_path, df, num_col_index)
+            self.loadFinished.emit(True)
+        except Exception as e:
+            print(f"Ошибка при загрузке файла: {e}")
+            self._restore_state_before_loading()
+            self.loadFinished.emit(False)
+
+    def _on_load_error(self, message: str) -> None:
+        self.current_load_worker = None
+        self._restore_state_before_loading()
+        print(f"Ошибка при загрузке файла: {message}")
+        self.loadFinished.emit(False)
+
+    def _show_loaded_table(self, file_path: str, df: pd.DataFrame, num_col_index: int) -> None:
+        self.num_col_index = num_col_index
+        self.num_mode = "excel"
+        self.model = SmartTableModel(df, self.num_mode, self.num_col_index, self.data_processor.get_sort_key)
+        self.view.setModel(self.model)
+        self.view.adjust_columns()
+        self.current_file_path = file_path
+
     def get_columns(self) -> List[str]:
         if self.model is None:
             return []
@@ -60,13 +193,14 @@ class TableController(QObject):
             self.model.layoutChanged.emit()
             self.view.adjust_columns()
 
-    def set_filtered_dataframe(self, df: pd.DataFrame):
-        if self.model is not None:
-            self.model.set_dataframe(df)
+    def set_filtered_rows(self, rows: np.ndarray):
+        """Показывает строки current_df с указанными позициями"""
+        if self.model is not None and not self.is_loading():
+            self.model.set_rows(rows)
             self.view.adjust_columns()
 
     def reset_all(self):
-        if self.model is None or self.data_processor.current_df is None:
+        if self.model is None or self.data_processor.current_df is None or self.is_loading():
             return
         self.model.set_dataframe(self.data_processor.current_df)
         index = self.num_col_index
@@ -84,7 +218,7 @@ class TableController(QObject):
     def get_column_values(self, column_name: str) -> List[str]:
         if self.model is None or self.data_processor.current_df is None:
             return []
-        return self.data_processor.current_df[column_name].unique().tolist()
+        return self.data_processor.get_column_values(column_name)
         
     def analyze_column_data(self, column_name: str) -> Dict:
         """Анализирует данные колонки и возвращает статистику."""
@@ -93,29 +227,22 @@ class TableController(QObject):
             
         try:
             column_data = self.data_processor.current_df[column_name]
+            column_type = self.data_processor.get_column_type(column_name)
             result = {
                 "max_length": max([len(str(v)) for v in column_data if v and str(v).strip()], default=0),
                 "unique_count": len(column_data.unique()),
-                "is_numeric": False,
-                "is_date": False,
+                "column_type": column_type,
+                "is_numeric": column_type in ColumnTypes.NUMERIC,
+                "is_date": column_type == ColumnTypes.DATE,
                 "sample_values": list(column_data.unique())[:10]
             }
-            
-            # Проверяем, числовая ли колонка
-            try:
-                numeric_values = pd.to_numeric(column_data, errors='coerce')
-                if not numeric_values.isna().all():
-                    result["is_numeric"] = True
-            except:
-                pass
-                
             return result
         except:
             return {}
 
     def add_record(self, record_data: Dict[str, str]) -> bool:
         """Добавляет новую запись в таблицу и сохраняет в Excel-файл."""
-        if self.model is None or self.data_processor.current_df is None:
+        if self.model is None or self.data_processor.current_df is None or self.is_loading():
             return False
             
         try:
@@ -140,15 +267,16 @@ class TableController(QObject):
             # Если проверка прошла успешно или не требуется сохранение, добавляем запись
             self.data_processor.add_record(new_record)
             
+            # Добавляем строку в модель без перестроения таблицы
+            self.model.append_row(self.data_processor.current_df)
+            self.view.adjust_columns()
+            
             # Сохраняем изменения в Excel-файл
             if self.current_file_path:
                 save_result = self.save_to_excel()
                 if not save_result:
                     return False
             
-            # Обновляем модель
-            self.model.set_dataframe(self.data_processor.current_df)
-            self.view.adjust_columns()
             return True
                 
         except Exception as e:
@@ -239,7 +367,7 @@ class TableController(QObject):
         
     def update_record(self, row_id: str, record_data: Dict[str, Any]) -> bool:
         """Обновляет запись по её ID."""
-        if self.model is None or self.data_processor.current_df is None:
+        if self.model is None or self.data_processor.current_df is None or self.is_loading():
             return False
             
         try:
@@ -248,12 +376,12 @@ class TableController(QObject):
             if row_index == -1:
                 return False
             
-            # Обновляем значения
-            for col, value in record_data.items():
-                if col in self.data_processor.current_df.columns:
-                    # Не обновляем колонку ID
-                    if col.lower() not in ["excel #", "№", "№ (порядок)"]:
-                        self.data_processor.current_df.at[row_index, col] = value
+            # Обновляем значения (колонка ID не изменяется)
+            self.data_processor.update_record(row_index, record_data)
+            
+            # Перерисовываем только измененную строку
+            self.model.update_row(row_index)
+            self.view.adjust_columns()
             
             # Сохраняем изменения
             if self.current_file_path:
@@ -261,9 +389,6 @@ class TableController(QObject):
                 if not save_result:
                     return False
             
-            # Обновляем модель
-            self.model.set_dataframe(self.data_processor.current_df)
-            self.view.adjust_columns()
             return True
                 
         except Exception as e:
@@ -272,7 +397,7 @@ class TableController(QObject):
             
     def delete_record(self, row_id: str) -> bool:
         """Удаляет запись по её ID."""
-        if self.model is None or self.data_processor.current_df is None:
+        if self.model is None or self.data_processor.current_df is None or self.is_loading():
             return False
             
         try:
@@ -282,7 +407,11 @@ class TableController(QObject):
                 return False
             
             # Удаляем строку
-            self.data_processor.current_df = self.data_processor.current_df.drop(index=row_index).reset_index(drop=True)
+            self.data_processor.delete_record(row_index)
+            
+            # Убираем строку из модели без перестроения таблицы
+            self.model.remove_row(row_index, self.data_processor.current_df)
+            self.view.adjust_columns()
             
             # Сохраняем изменения
             if self.current_file_path:
@@ -290,9 +419,6 @@ class TableController(QObject):
                 if not save_result:
                     return False
             
-            # Обновляем модель
-            self.model.set_dataframe(self.data_processor.current_df)
-            self.view.adjust_columns()
             return True
                 
         except Exception as e:
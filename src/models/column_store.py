@@ -0,0 +1,169 @@
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from utils.text_processor import TextProcessor
+from utils.token_index import TokenIndex
+from utils.column_types import ColumnTypes, ColumnProfile
+from utils.range_query import RangeQuery
+from utils.sorted_index import SortedIndex
+
+class ColumnStore:
+    """Производные представления колонок текущей таблицы.
+
+    Строится один раз после загрузки и обновляется точечно при добавлении,
+    изменении и удалении записей, чтобы поиск не пересчитывал их на каждый запрос.
+    Индекс строк совпадает с индексом текущего DataFrame.
+    """
+
+    def __init__(self, text_processor: TextProcessor):
+        self.text_processor = text_processor
+        self.normalized_df = pd.DataFrame()
+        self.token_indexes: Dict[str, TokenIndex] = {}  # Строятся при первом поиске по колонке
+        self.profiles: Dict[str, ColumnProfile] = {}
+        self.numeric_indexes: Dict[str, SortedIndex] = {}  # Числовые значения числовых колонок
+        self.date_indexes: Dict[str, SortedIndex] = {}  # Значения колонок дат в виде datetime64
+
+    def build(self, df: pd.DataFrame, progress: Optional[Callable[[int, int], None]] = None,
+              cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Строит нормализованные копии всех колонок и определяет их типы.
+
+        progress(обработано_колонок, всего_колонок) вызывается после каждой колонки;
+        если cancelled() вернул True, построение прерывается и возвращается False.
+        """
+        normalized: Dict[str, pd.Series] = {}
+        profiles: Dict[str, ColumnProfile] = {}
+        numeric_indexes: Dict[str, SortedIndex] = {}
+        date_indexes: Dict[str, SortedIndex] = {}
+        for done, col in enumerate(df.columns, start=1):
+            if cancelled is not None and cancelled():
+                return False
+            normalized[col] = self.text_processor.normalize_many(df[col])
+            profile = profiles[col] = ColumnProfile(df[col])
+            if profile.column_type == ColumnTypes.CATEGORICAL:
+                # Мало различных значений — храним коды и словарь
+                normalized[col] = normalized[col].astype("category")
+            if profile.column_type in ColumnTypes.NUMERIC:
+                numeric_indexes[col] = SortedIndex(ColumnTypes.parse_numbers(df[col]).to_numpy())
+            elif profile.column_type == ColumnTypes.DATE:
+                date_indexes[col] = SortedIndex(ColumnTypes.parse_dates(df[col]).to_numpy())
+            if progress is not None:
+                progress(done, len(df.columns))
+
+        self.normalized_df = pd.DataFrame(normalized, index=df.index, columns=df.columns)
+        self.token_indexes = {}
+        self.profiles = profiles
+        self.numeric_indexes = numeric_indexes
+        self.date_indexes = date_indexes
+        return True
+
+    def restore(self, normalized_df: pd.DataFrame, profiles: Dict[str, ColumnProfile],
+                numeric_values: Dict[str, np.ndarray], date_values: Dict[str, np.ndarray]) -> None:
+        """Восстанавливает представления, сохраненные ранее (см. TableCache), без пересчета"""
+        self.normalized_df = normalized_df
+        self.token_indexes = {}
+        self.profiles = profiles
+        self.numeric_indexes = {col: SortedIndex(values) for col, values in numeric_values.items()}
+        self.date_indexes = {col: SortedIndex(values) for col, values in date_values.items()}
+
+    def normalized(self, column: str) -> pd.Series:
+        return self.normalized_df[column]
+
+    def column_type(self, column: str) -> str:
+        """Тип колонки (см. ColumnTypes), определенный при загрузке и поддерживаемый при правках"""
+        profile = self.profiles.get(column)
+        return profile.column_type if profile is not None else ColumnTypes.TEXT
+
+    @property
+    def column_types(self) -> Dict[str, str]:
+        return {col: profile.column_type for col, profile in self.profiles.items()}
+
+    def append_row(self, row: Dict[str, str]) -> None:
+        """Добавляет нормализованную строку в конец"""
+        normalized_row = {col: self.text_processor.normalize(row.get(col, "")) for col in self.normalized_df.columns}
+        for column, profile in self.profiles.items():
+            profile.add_value(row.get(column, ""))
+        for column, value in normalized_row.items():
+            ColumnTypes.add_category(self.normalized_df, column, value)
+        new_row_df = pd.DataFrame([normalized_row], columns=self.normalized_df.columns)
+        new_row_df = new_row_df.astype(self.normalized_df.dtypes.to_dict())
+        self.normalized_df = pd.concat([self.normalized_df, new_row_df], ignore_index=True)
+        position = len(self.normalized_df) - 1
+        for column, token_index in self.token_indexes.items():
+            token_index.add_row(position, normalized_row[column])
+        for column, typed_index, parse_value in self._typed_indexes():
+            typed_index.append(parse_value(row.get(column, "")))
+
+    def update_cell(self, row_index: int, column: str, old_value: str, value: str) -> None:
+        profile = self.profiles.get(column)
+        if profile is not None:
+            profile.remove_value(old_value)
+            profile.add_value(value)
+        for typed_column, typed_index, parse_value in self._typed_indexes():
+            if typed_column == column:
+                typed_index.set_value(self.normalized_df.index.get_loc(row_index), parse_value(value))
+        
+        if column in self.normalized_df.columns:
+            old_normalized = self.normalized_df.at[row_index, column]
+            new_normalized = self.text_processor.normalize(value)
+            ColumnTypes.add_category(self.normalized_df, column, new_normalized)
+            self.normalized_df.at[row_index, column] = new_normalized
+            token_index = self.token_indexes.get(column)
+            if token_index is not None:
+                token_index.update_row(self.normalized_df.index.get_loc(row_index), old_normalized, new_normalized)
+
+    def delete_row(self, row_index: int, row: Dict[str, str]) -> None:
+        """Удаляет строку; row — ее исходные значения"""
+        for column, profile in self.profiles.items():
+            profile.remove_value(row.get(column, ""))
+        position = self.normalized_df.index.get_loc(row_index)
+        for _, typed_index, _ in self._typed_indexes():
+            typed_index.delete(position)
+        
+        for column, token_index in self.token_indexes.items():
+            token_index.delete_row(position, self.normalized_df.at[row_index, column])
+        self.normalized_df = self.normalized_df.drop(index=row_index).reset_index(drop=True)
+
+    def keyword_rows(self, column: str, keywords: List[str]) -> np.ndarray:
+        """Позиции строк, нормализованный текст которых содержит все ключевые слова"""
+        token_index = self.token_indexes.get(column)
+        if token_index is None:
+            token_index = self.token_indexes[column] = TokenIndex(self.normalized_df[column])
+        return token_index.search(keywords)
+
+    def numeric_rows(self, column: str, values: pd.Series, query: RangeQuery) -> np.ndarray:
+        """Позиции строк числовой колонки, удовлетворяющих условию; values — исходная колонка"""
+        return self.numeric_index(column, values).query(query)
+
+    def date_rows(self, column: str, values: pd.Series, query: RangeQuery) -> np.ndarray:
+        """Позиции строк колонки дат, удовлетворяющих условию; values — исходная колонка"""
+        return self.date_index(column, values).query(query)
+
+    def numeric_index(self, column: str, values: pd.Series) -> SortedIndex:
+        """Числовые значения колонки; для колонок, ставших числовыми после правок, строятся по запросу"""
+        numeric_index = self.numeric_indexes.get(column)
+        if numeric_index is None:
+            numeric_index = self.numeric_indexes[column] = SortedIndex(ColumnTypes.parse_numbers(values).to_numpy())
+        return numeric_index
+
+    def date_index(self, column: str, values: pd.Series) -> SortedIndex:
+        """Даты колонки; для колонок, ставших датами после правок, строятся по запросу"""
+        date_index = self.date_indexes.get(column)
+        if date_index is None:
+            date_index = self.date_indexes[column] = SortedIndex(ColumnTypes.parse_dates(values).to_numpy())
+        return date_index
+
+    def sort_key(self, column: str, values: pd.Series) -> Optional[np.ndarray]:
+        """Ключ сортировки по позициям строк: числа или даты; None — сортировать как текст"""
+        column_type = self.column_type(column)
+        if column_type in ColumnTypes.NUMERIC:
+            return self.numeric_index(column, values).values
+        if column_type == ColumnTypes.DATE:
+            return self.date_index(column, values).values
+        return None
+
+    def _typed_indexes(self):
+        """Все типизированные массивы с функцией разбора значения для каждого"""
+        for column, numeric_index in self.numeric_indexes.items():
+            yield column, numeric_index, ColumnTypes.parse_number
+        for column, date_index in self.date_indexes.items():
+            yield column, date_index, ColumnTypes.parse_date
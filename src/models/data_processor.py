@@ -1,35 +1,171 @@
-from typing import Tuple, List, Dict, Optional
+from typing import Callable, Tuple, List, Dict, Optional
+import numpy as np
 import pandas as pd
 from utils.text_processor import TextProcessor
 from utils.similarity_analyzer import SimilarityAnalyzer
-from models.smart_grouper import SmartGrouper
+from utils.group_cache import GroupCache
+from models.smart_grouper import SmartGrouper, GroupIndex
+from models.column_store import ColumnStore
+from models.table_cache import TableCache
+from utils.column_types import ColumnTypes
+from utils.range_query import RangeQuery
+from utils.excel_stream_reader import ExcelStreamReader
 
 class DataProcessor:
+    # Этапы загрузки файла для индикатора прогресса
+    LOAD_PHASE_CACHE = "Проверка кэша"
+    LOAD_PHASE_READ = "Чтение файла"
+    LOAD_PHASE_CONVERT = "Преобразование колонок"
+    LOAD_PHASE_ANALYZE = "Анализ колонок"
+
     def __init__(self):
         self.text_processor = TextProcessor()
         self.similarity_analyzer = SimilarityAnalyzer()
         self.grouper = SmartGrouper("resources/seed_groups.json")
+        self.group_cache = GroupCache()
+        self.column_store = ColumnStore(self.text_processor)
+        self.table_cache = TableCache()
+        # Хранить строки таблицы в массивах Arrow, отображенных из файла кэша, а не в объектах str
+        self.arrow_backend = True
         self.current_df: Optional[pd.DataFrame] = None
+        self.current_file_path: Optional[str] = None
         self.similar_groups: Dict[str, set] = {}
+        self.group_indexes: Dict[str, GroupIndex] = {}  # Группы колонок, поддерживаемые при правках
         self.excel_num_column_added = False  # Флаг, указывающий, добавили ли мы сами колонку Excel #
+        # Начиная с этого числа уникальных значений колонка группируется через MinHash/LSH
+        self.minhash_min_values = 100_000
 
     def load_excel(self, file_path: str) -> Tuple[pd.DataFrame, int]:
+        df, num_col_index, num_column_added, column_store = self.read_excel(file_path)
+        self.set_loaded_table(file_path, df, num_col_index, num_column_added, column_store)
+        return df, num_col_index
+
+    def read_excel(self, file_path: str, progress: Optional[Callable[[str, int, int], None]] = None,
+                   cancelled: Optional[Callable[[], bool]] = None,
+                   on_rows: Optional[Callable[[pd.DataFrame], None]] = None
+                   ) -> Optional[Tuple[pd.DataFrame, int, bool, ColumnStore]]:
+        """Читает файл и строит производные колонки, не меняя текущее состояние.
+
+        Может выполняться в фоновом потоке. progress(этап, обработано, всего) сообщает
+        о ходе загрузки; если cancelled() вернул True, загрузка прерывается и возвращается None.
+        Если передан on_rows и формат это позволяет, файл читается потоково: после каждой
+        порции on_rows получает только что прочитанные строки (новый DataFrame на каждую порцию).
+        """
+        def report(phase: str, done: int, total: int) -> None:
+            if progress is not None:
+                progress(phase, done, total)
+
+        def is_cancelled() -> bool:
+            return cancelled is not None and cancelled()
+
+        # Неизмененная книга берется из кэша обработанных таблиц
+        signature = None
+        if self.table_cache.enabled:
+            report(self.LOAD_PHASE_CACHE, 0, 0)
+            signature = self.table_cache.file_signature(file_path)
+            if signature is not None:
+                cached = self.table_cache.get(signature, self.text_processor, arrow_backed=self.arrow_backend)
+                if cached is not None:
+                    return cached
+
+        if on_rows is not None and ExcelStreamReader.supports(file_path):
+            loaded = self._read_excel_stream(file_path, on_rows, report, is_cancelled)
+        else:
+            loaded = self._read_excel_whole(file_path, report, is_cancelled)
+        if loaded is None:
+            return None
+        df, num_col_index, num_column_added = loaded
+
+        column_store = ColumnStore(self.text_processor)
+        built = column_store.build(
+            df,
+            progress=lambda done, total: report(self.LOAD_PHASE_ANALYZE, done, total),
+            cancelled=is_cancelled
+        )
+        if not built:
+            return None
+        df = self._encode_categorical_columns(df, column_store)
+        if signature is not None and self.table_cache.put(signature, df, num_col_index, num_column_added, column_store):
+            if self.arrow_backend:
+                # Переходим на только что записанный кэш, освобождая строки, прочитанные из книги
+                cached = self.table_cache.get(signature, self.text_processor, arrow_backed=True)
+                if cached is not None:
+                    return cached
+        return df, num_col_index, num_column_added, column_store
+
+    def _read_excel_whole(self, file_path: str, report: Callable[[str, int, int], None],
+                          is_cancelled: Callable[[], bool]) -> Optional[Tuple[pd.DataFrame, int, bool]]:
+        report(self.LOAD_PHASE_READ, 0, 0)
         df = pd.read_excel(file_path)
+        if is_cancelled():
+            return None
+        report(self.LOAD_PHASE_READ, len(df), len(df))
+
         num_col_index = self.text_processor.find_num_column(df.columns)
         if num_col_index is None:
-            # Добавляем колонку Excel # и устанавливаем флаг
+            # Добавляем колонку Excel # и запоминаем это
             df.insert(0, "Excel #", df.index + 2)
             num_col_index = 0
-            self.excel_num_column_added = True
+            num_column_added = True
         else:
             # Колонка с номерами уже есть в файле
-            self.excel_num_column_added = False
+            num_column_added = False
             
         df = df.fillna("")
-        for col in df.columns:
+        for done, col in enumerate(df.columns, start=1):
+            if is_cancelled():
+                return None
             df[col] = df[col].astype(str)
+            report(self.LOAD_PHASE_CONVERT, done, len(df.columns))
+        return df, num_col_index, num_column_added
+
+    def _read_excel_stream(self, file_path: str, on_rows: Callable[[pd.DataFrame], None],
+                           report: Callable[[str, int, int], None],
+                           is_cancelled: Callable[[], bool]) -> Optional[Tuple[pd.DataFrame, int, bool]]:
+        reader = ExcelStreamReader(file_path)
+        report(self.LOAD_PHASE_READ, 0, 0)
+        chunks: List[pd.DataFrame] = []
+        loaded = 0
+        num_col_index: Optional[int] = None
+        num_column_added = False
+        for chunk in reader.chunks():
+            if is_cancelled():
+                return None
+            if not chunks:
+                num_col_index = self.text_processor.find_num_column(chunk.columns)
+                num_column_added = num_col_index is None
+            if num_column_added:
+                # Номер строки в Excel: заголовок — первая строка
+                chunk.insert(0, "Excel #", (chunk.index + 2).astype(str))
+            # Передаем только новую порцию; после передачи она не изменяется
+            chunks.append(chunk)
+            loaded += len(chunk)
+            on_rows(chunk)
+            report(self.LOAD_PHASE_READ, loaded, max(reader.total_rows, loaded))
+
+        if is_cancelled():
+            return None
+        if not chunks:
+            # В листе только заголовок (или он пуст)
+            df = reader.empty_frame()
+            num_col_index = self.text_processor.find_num_column(df.columns)
+            num_column_added = num_col_index is None
+            if num_column_added:
+                df.insert(0, "Excel #", pd.Series(dtype=str))
+            on_rows(df)
+        else:
+            # Таблица склеивается из порций один раз, после чтения всего листа
+            df = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+        return df, (0 if num_column_added else num_col_index), num_column_added
+
+    def set_loaded_table(self, file_path: str, df: pd.DataFrame, num_col_index: int,
+                         num_column_added: bool, column_store: ColumnStore) -> None:
+        """Делает прочитанную таблицу текущей"""
         self.current_df = df
-        return df, num_col_index
+        self.current_file_path = file_path
+        self.excel_num_column_added = num_column_added
+        self.column_store = column_store
+        self.group_indexes = {}
 
     def save_excel(self, file_path: str) -> bool:
         """Сохраняет текущий DataFrame в Excel-файл."""
@@ -77,7 +213,43 @@ class DataProcessor:
                 new_row["Excel #"] = str(len(self.current_df) + 2)
         
         # Добавляем строку в DataFrame
-        self.current_df = pd.concat([self.current_df, pd.DataFrame([new_row])], ignore_index=True)
+        # Приводим строку к типам колонок таблицы, чтобы не менять их хранение (например, Arrow)
+        for column in self.current_df.columns:
+            ColumnTypes.add_category(self.current_df, column, new_row[column])
+        new_row_df = pd.DataFrame([new_row]).astype(self.current_df.dtypes.to_dict())
+        self.current_df = pd.concat([self.current_df, new_row_df], ignore_index=True)
+        self.column_store.append_row(new_row.to_dict())
+        
+        # Точечно обновляем группы схожих значений
+        for column in list(self.group_indexes):
+            self._update_group_index(column, None, str(new_row[column]))
+
+    def update_record(self, row_index: int, record_data: Dict[str, str]) -> None:
+        """Обновляет значения строки текущего DataFrame (кроме колонок номеров)."""
+        if self.current_df is None:
+            return
+        
+        for col, value in record_data.items():
+            if col in self.current_df.columns and col.lower() not in ["excel #", "№", "№ (порядок)"]:
+                old_value = str(self.current_df.at[row_index, col])
+                ColumnTypes.add_category(self.current_df, col, value)
+                self.current_df.at[row_index, col] = value
+                self.column_store.update_cell(row_index, col, old_value, value)
+                
+                if old_value != str(value):
+                    self._update_group_index(col, old_value, str(value))
+
+    def delete_record(self, row_index: int) -> None:
+        """Удаляет строку из текущего DataFrame."""
+        if self.current_df is None:
+            return
+        
+        for column in list(self.group_indexes):
+            self._update_group_index(column, str(self.current_df.at[row_index, column]), None)
+        
+        deleted_row = self.current_df.loc[row_index].to_dict()
+        self.current_df = self.current_df.drop(index=row_index).reset_index(drop=True)
+        self.column_store.delete_row(row_index, deleted_row)
 
     def analyze_column(self, column_name: str) -> Dict[str, set]:
         """Анализирует колонку и находит группы схожих значений"""
@@ -85,11 +257,31 @@ class DataProcessor:
             return {}
             
         try:
+            # Группы, которые поддерживались при правках, уже актуальны. В кэш групп они
+            # не пишутся: без поиска аббревиатур и разделения групп они не равны полному пересчету
+            group_index = self.group_indexes.get(column_name)
+            if group_index is not None:
+                self.similar_groups = group_index.groups
+                return self.similar_groups
+            
             # Получаем все уникальные значения колонки
-            values = [str(v) for v in self.current_df[column_name].unique() if v and str(v).strip()]
+            values = [str(v) for v in self.get_column_values(column_name) if v and str(v).strip()]
+            
+            # Группируем схожие значения; для очень больших колонок — приближенно через MinHash/LSH.
+            # Движок TF-IDF сюда не подставляется: он доступен только при явном выборе
+            engine = "minhash" if len(values) >= self.minhash_min_values else None
+            cache_params = self._cache_params(engine)
+            content_hash = self.group_cache.content_hash(values)
             
-            # Группируем схожие значения
-            self.similar_groups = self.grouper.group(values)
+            cached_groups = self.group_cache.get(self.current_file_path, column_name, content_hash, cache_params)
+            if cached_groups is not None:
+                self.similar_groups = cached_groups
+                self._build_group_index(column_name)
+                return self.similar_groups
+            
+            self.similar_groups = self.grouper.group(values, engine)
+            self.group_cache.put(self.current_file_path, column_name, content_hash, cache_params, self.similar_groups)
+            self._build_group_index(column_name)
             
             # Для отладки выведем найденные группы
             print(f"Найдено {len(self.similar_groups)} групп схожих значений в колонке '{column_name}'")
@@ -102,35 +294,107 @@ class DataProcessor:
             print(f"Ошибка при анализе колонки '{column_name}': {e}")
             return {}
 
+    def get_column_values(self, column_name: str) -> List[str]:
+        """Различные значения колонки в порядке первого появления"""
+        if self.current_df is None or column_name not in self.current_df.columns:
+            return []
+        values = self.current_df[column_name]
+        if ColumnTypes.is_categorical(values):
+            # Берем значения из словаря по встречающимся кодам, не перебирая строки
+            codes = values.cat.codes.to_numpy()
+            used_codes = pd.unique(codes[codes >= 0])
+            return values.cat.categories.take(used_codes).tolist()
+        return values.unique().tolist()
+
+    def get_column_type(self, column_name: str) -> str:
+        """Возвращает тип колонки (см. ColumnTypes)"""
+        return self.column_store.column_type(column_name)
+
+    def get_sort_key(self, column_name: str) -> Optional[np.ndarray]:
+        """Возвращает числовой или хронологический ключ сортировки по позициям строк current_df"""
+        if self.current_df is None or column_name not in self.current_df.columns:
+            return None
+        return self.column_store.sort_key(column_name, self.current_df[column_name])
+
+    def _cache_params(self, engine: Optional[str]) -> Dict[str, str]:
+        analyzer = self.grouper.similarity_analyzer
+        return {
+            "threshold": str(analyzer.similarity_threshold),
+            "engine": engine or analyzer.engine,
+            "version": str(analyzer.ALGORITHM_VERSION)
+        }
+
+    def _build_group_index(self, column_name: str) -> None:
+        """Запоминает группы колонки для инкрементального обновления при правках"""
+        counts = self.current_df[column_name].value_counts()
+        self.group_indexes[column_name] = self.grouper.build_index(self.similar_groups, counts.to_dict())
+
+    def _update_group_index(self, column_name: str, old_value: Optional[str], new_value: Optional[str]) -> None:
+        """Переносит изменение значения колонки в ее группы без полного пересчета"""
+        group_index = self.group_indexes.get(column_name)
+        if group_index is None:
+            return
+        try:
+            if old_value is not None:
+                group_index.remove_value(old_value)
+            if new_value is not None:
+                group_index.add_value(new_value)
+        except Exception as e:
+            # При сбое группы колонки будут пересчитаны целиком при следующем анализе
+            print(f"Ошибка при обновлении групп колонки '{column_name}': {e}")
+            del self.group_indexes[column_name]
+
+    def _rows_with_values(self, column: str, values) -> np.ndarray:
+        """Позиции строк, значение которых входит в values; для категорий — через словарь"""
+        series = self.current_df[column]
+        if ColumnTypes.is_categorical(series):
+            matched_codes = np.flatnonzero(series.cat.categories.isin(list(values)))
+            return np.flatnonzero(np.isin(series.cat.codes.to_numpy(), matched_codes))
+        return np.flatnonzero(series.isin(values).to_numpy())
+
+    def _encode_categorical_columns(self, df: pd.DataFrame, column_store: ColumnStore) -> pd.DataFrame:
+        """Копия таблицы, где колонки с небольшим числом различных значений хранятся как категории.
+
+        Исходный DataFrame не меняется: при потоковой загрузке он уже отображается в UI.
+        """
+        encoded = df.copy(deep=False)
+        for column in df.columns:
+            if column_store.column_type(column) == ColumnTypes.CATEGORICAL:
+                encoded[column] = df[column].astype("category")
+        return encoded
+
     def filter_data(self, column: str, filter_text: str) -> pd.DataFrame:
-        if self.current_df is None or column not in self.current_df.columns:
+        """Возвращает строки, удовлетворяющие фильтру, в виде DataFrame"""
+        if self.current_df is None:
             return pd.DataFrame()
+        return self.current_df.iloc[self.filter_rows(column, filter_text)]
+
+    def filter_rows(self, column: str, filter_text: str) -> np.ndarray:
+        """Возвращает отсортированные позиции строк current_df, удовлетворяющих фильтру.
+
+        Копии данных не создаются: модель таблицы отображает строки по этим позициям.
+        """
+        if self.current_df is None or column not in self.current_df.columns:
+            return np.empty(0, dtype=np.int64)
         
         if not filter_text:
-            return self.current_df.copy()
+            return np.arange(len(self.current_df))
         
-        # Проверяем, является ли колонка числовой
-        is_numeric = True
-        try:
-            # Проверяем, можно ли преобразовать непустые значения в числа
-            values = [v for v in self.current_df[column].unique() if str(v).strip()]
-            for v in values:
-                float(v)
-        except ValueError:
-            is_numeric = False
+        # Тип колонки определен при загрузке
+        column_type = self.column_store.column_type(column)
         
-        # Если колонка числовая, делаем точное числовое сравнение
-        if is_numeric:
-            try:
-                filter_value = float(filter_text)
-                # Преобразуем строковые значения в числа для сравнения
-                mask = self.current_df[column].apply(
-                    lambda x: str(x).strip() and float(str(x).strip()) == filter_value if str(x).strip() else False
-                )
-                return self.current_df[mask].copy()
-            except ValueError:
-                # Если не удалось преобразовать filter_text в число, продолжаем обычный поиск
-                pass
+        # Если колонка числовая, понимаем равенство, сравнения, диапазоны и списки чисел
+        if column_type in ColumnTypes.NUMERIC:
+            query = RangeQuery.parse(filter_text, ColumnTypes.parse_number)
+            if query is not None:
+                return self.column_store.numeric_rows(column, self.current_df[column], query)
+            # Если условие не разобрано как числовое, продолжаем обычный поиск
+        
+        # Для колонок дат — те же условия над датами: "> 01.01.2000", "between 2000-01-01 and 2010-12-31"
+        if column_type == ColumnTypes.DATE:
+            query = RangeQuery.parse(filter_text, ColumnTypes.parse_date)
+            if query is not None:
+                return self.column_store.date_rows(column, self.current_df[column], query)
         
         # Если это не числовая колонка или числовой поиск не дал результатов, используем существующую логику
         normalized_filter = self.text_processor.normalize(filter_text)
@@ -138,14 +402,11 @@ class DataProcessor:
         if self.similar_groups:
             for group_key, group_values in self.similar_groups.items():
                 if self.text_processor.normalize(group_key) == normalized_filter:
-                    mask = self.current_df[column].isin(group_values)
-                    return self.current_df[mask].copy()
+                    return self._rows_with_values(column, group_values)
         
         keywords = self.text_processor.extract_keywords(filter_text)
         if keywords:
-            mask = self.current_df[column].apply(
-                lambda x: all(kw in self.text_processor.normalize(x) for kw in keywords)
-            )
-            return self.current_df[mask].copy()
+            # Ищем по индексу слов нормализованной копии колонки
+            return self.column_store.keyword_rows(column, keywords)
         
-        return pd.DataFrame()
\ No newline at end of file
+        return np.empty(0, dtype=np.int64)
\ No newline at end of file
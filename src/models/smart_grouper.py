@@ -1,12 +1,212 @@
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Optional
+import numpy as np
 from utils.text_processor import TextProcessor
 from utils.similarity_analyzer import SimilarityAnalyzer
+from utils.seed_groups import load_seed_groups
+
+class GroupIndex:
+    """Группы схожих значений одной колонки с индексом для точечных изменений.
+
+    Новое значение присоединяется к существующей группе по словарю организаций,
+    совпадению после нормализации или по схожести с кандидатами из индексов
+    символов и n-грамм.
+    Удаленное значение просто исключается из своей группы: группы при этом
+    не разделяются, а представитель меняется, только если удален он сам.
+    """
+
+    def __init__(self, analyzer: SimilarityAnalyzer, groups: Dict[str, Set[str]], counts: Dict[str, int]):
+        self.analyzer = analyzer
+        self.groups = groups
+        self.counts = dict(counts)
+        self.value_to_group: Dict[str, str] = {}
+        for rep, values in groups.items():
+            for value in values:
+                self.value_to_group[value] = rep
+
+        # Индексы кандидатов строятся при первом изменении
+        self._processed: Optional[Dict[str, str]] = None
+        self._gram_index: Dict[str, Set[str]] = {}
+        self._gram_sizes: Dict[str, int] = {}
+        self._by_length: Dict[int, Set[str]] = {}
+        self._by_text: Dict[str, Set[str]] = {}
+        self._by_norm: Dict[str, Set[str]] = {}
+
+    def add_value(self, value: str) -> None:
+        """Учитывает новое вхождение значения в колонке"""
+        if not value or not str(value).strip():
+            return
+        self.counts[value] = self.counts.get(value, 0) + 1
+        if value in self.value_to_group:
+            return
+
+        self._ensure_indexes()
+        reps = self._find_matching_groups(value)
+        if not reps:
+            self.groups[value] = {value}
+            self.value_to_group[value] = value
+        else:
+            rep = reps[0] if len(reps) == 1 else self._merge_groups(reps)
+            group = self.groups[rep]
+            was_single = len(group) == 1 and rep in group
+            group.add(value)
+            self.value_to_group[value] = rep
+            if was_single:
+                # Группа из одного элемента впервые получила пару — выбираем представителя заново
+                # Центральность по всей группе квадратична, поэтому берем самое частое значение
+                self._rename_group(rep, max(group, key=lambda v: (self.counts.get(v, 0), v)))
+
+        self._index_value(value)
+
+    def remove_value(self, value: str) -> None:
+        """Учитывает удаление одного вхождения значения из колонки"""
+        if not value or value not in self.counts:
+            return
+        self.counts[value] -= 1
+        if self.counts[value] > 0:
+            return
+        del self.counts[value]
+
+        rep = self.value_to_group.pop(value, None)
+        if rep is not None:
+            group = self.groups[rep]
+            group.discard(value)
+            if not group:
+                del self.groups[rep]
+            elif rep == value:
+                # Центральность по всей группе квадратична, поэтому берем самое частое значение
+                self._rename_group(rep, max(group, key=lambda v: (self.counts.get(v, 0), v)))
+
+        if self._processed is not None:
+            self._unindex_value(value)
+
+    def _find_matching_groups(self, value: str) -> List[str]:
+        """Возвращает представителей групп, к которым подходит значение"""
+        reps = []
+
+        seed_rep = self.analyzer.seed_groups.classify(value)
+        if seed_rep is not None and seed_rep in self.groups:
+            reps.append(seed_rep)
+
+        for other in self._by_norm.get(self.analyzer.text_processor.normalize(value), ()):
+            reps.append(self.value_to_group[other])
+
+        text = self.analyzer._preprocess_for_tfidf(value).lower()
+        grams = self.analyzer._text_ngrams(text)
+        threshold = float(self.analyzer.similarity_threshold)
+        for other in self._candidates(text, grams):
+            other_text = self._processed[other].lower()
+            similarity = self.analyzer._similarity(text, other_text, grams, self.analyzer._text_ngrams(other_text))
+            if similarity > threshold:
+                reps.append(self.value_to_group[other])
+
+        return list(dict.fromkeys(reps))
+
+    def _candidates(self, text: str, grams: Set[str]) -> Set[str]:
+        """Кандидаты для проверки схожести: по мере Жаккара n-грамм и по вхождению текстов"""
+        if not text:
+            return set()
+        threshold = min(max(float(self.analyzer.similarity_threshold), 0.0), 1.0)
+        result = set()
+
+        # Значение со схожими n-граммами содержит одну из префикса самых редких n-грамм нового,
+        # а значение, содержащее новое, — весь префикс
+        prefix = sorted(grams, key=lambda g: len(self._gram_index.get(g, ())))
+        prefix = prefix[:max(len(prefix) - int(np.ceil(threshold * len(prefix))) + 1, 1)]
+        hits: Dict[str, int] = {}
+        for gram in prefix:
+            for other in self._gram_index.get(gram, ()):
+                hits[other] = hits.get(other, 0) + 1
+        for other, count in hits.items():
+            # Каждая отсутствующая n-грамма префикса уменьшает возможное пересечение
+            missing = len(prefix) - count
+            if (missing == 0
+                    or (len(grams) - missing) * (1 + threshold) >= threshold * (len(grams) + self._gram_sizes[other])):
+                result.add(other)
+
+        # Короче n-граммы в значениях не найти, поэтому содержащие его ищем по длине
+        if len(text) < self.analyzer.ngram_size:
+            max_length = int(np.ceil(len(text) / threshold)) if threshold > 0 else max(self._by_length, default=0)
+            for length in range(len(text) + 1, max_length + 1):
+                for other in self._by_length.get(length, ()):
+                    if text in self._processed[other].lower():
+                        result.add(other)
+
+        # Значения, входящие в новое, — по его подстрокам достаточной длины
+        min_length = int(threshold * len(text)) + 1
+        for length in range(min(min_length, len(text)), len(text) + 1):
+            for start in range(len(text) - length + 1):
+                result.update(self._by_text.get(text[start:start + length], ()))
+        return result
+
+    def _merge_groups(self, reps: List[str]) -> str:
+        """Объединяет группы, связанные новым значением, и возвращает нового представителя"""
+        merged = set()
+        for rep in reps:
+            merged.update(self.groups.pop(rep))
+        new_rep = self.analyzer._select_representative(set(reps))
+        self.groups[new_rep] = merged
+        for value in merged:
+            self.value_to_group[value] = new_rep
+        return new_rep
+
+    def _rename_group(self, old_rep: str, new_rep: str) -> None:
+        if old_rep == new_rep:
+            return
+        group = self.groups.pop(old_rep)
+        self.groups[new_rep] = group
+        for value in group:
+            self.value_to_group[value] = new_rep
+
+    def _ensure_indexes(self) -> None:
+        if self._processed is not None:
+            return
+        self._processed = {}
+        for value in self.value_to_group:
+            self._index_value(value)
+
+    def _index_value(self, value: str) -> None:
+        processed = self.analyzer._preprocess_for_tfidf(value)
+        self._processed[value] = processed
+        text = processed.lower()
+        grams = self.analyzer._text_ngrams(text)
+        for gram in grams:
+            self._gram_index.setdefault(gram, set()).add(value)
+        self._gram_sizes[value] = len(grams)
+        self._by_length.setdefault(len(text), set()).add(value)
+        self._by_text.setdefault(text, set()).add(value)
+        self._by_norm.setdefault(self.analyzer.text_processor.normalize(value), set()).add(value)
+
+    def _unindex_value(self, value: str) -> None:
+        processed = self._processed.pop(value, None)
+        if processed is None:
+            return
+        del self._gram_sizes[value]
+        text = processed.lower()
+        for index, keys in ((self._gram_index, self.analyzer._text_ngrams(text)),
+                            (self._by_length, (len(text),)),
+                            (self._by_text, (text,))):
+            for key in keys:
+                postings = index.get(key)
+                if postings is not None:
+                    postings.discard(value)
+                    if not postings:
+                        del index[key]
+        norm = self.analyzer.text_processor.normalize(value)
+        same_norm = self._by_norm.get(norm)
+        if same_norm is not None:
+            same_norm.discard(value)
+            if not same_norm:
+                del self._by_norm[norm]
 
 class SmartGrouper:
-    def __init__(self, threshold: float = 0.75):
+    def __init__(self, seed_groups_path: Optional[str] = None, threshold: float = 0.75):
         self.text_processor = TextProcessor()
-        self.similarity_analyzer = SimilarityAnalyzer(threshold)
+        self.similarity_analyzer = SimilarityAnalyzer(threshold, seed_groups=load_seed_groups(seed_groups_path))
 
-    def group(self, texts: List[str]) -> Dict[str, Set[str]]:
+    def group(self, texts: List[str], engine: Optional[str] = None) -> Dict[str, Set[str]]:
         # Используем только улучшенный анализатор схожести
-        return self.similarity_analyzer.find_similar_groups(texts)
\ No newline at end of file
+        return self.similarity_analyzer.find_similar_groups(texts, engine)
+
+    def build_index(self, groups: Dict[str, Set[str]], counts: Dict[str, int]) -> GroupIndex:
+        """Создает индекс для инкрементального обновления уже найденных групп"""
+        return GroupIndex(self.similarity_analyzer, groups, counts)
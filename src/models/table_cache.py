@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from models.column_store import ColumnStore
+from utils.column_types import ColumnTypes, ColumnProfile
+from utils.text_processor import TextProcessor
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    # Без pyarrow кэш таблиц отключен, файлы всегда читаются заново
+    pa = None
+    feather = None
+
+class TableCache:
+    """Кэш обработанных таблиц в формате Arrow/Feather в отдельной папке.
+
+    Для каждой книги хранится один файл: строки таблицы, нормализованные колонки,
+    числовые массивы и даты, а в метаданных — профили колонок и сведения о книге.
+    Файлы пишутся без сжатия, чтобы строковые колонки можно было отображать в память
+    (arrow_backed=True в get) и не создавать объекты str для всех ячеек.
+    Запись действительна, пока у книги совпадают путь, размер, время изменения
+    и хеш содержимого. Если папка превышает max_bytes, удаляются записи,
+    которые дольше всего не использовались.
+    """
+
+    FORMAT_VERSION = 2
+    DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+    DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".smart_table", "table_cache")
+    ENTRY_EXTENSION = ".feather"
+
+    # Префиксы имен колонок Arrow для разных представлений одной колонки таблицы
+    _TABLE_PREFIX = "t:"
+    _NORMALIZED_PREFIX = "n:"
+    _NUMERIC_PREFIX = "f:"
+    _DATE_PREFIX = "d:"
+    _METADATA_KEY = b"smart_table"
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or self.DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return feather is not None
+
+    @staticmethod
+    def file_signature(file_path: str) -> Optional[Dict[str, object]]:
+        """Путь, размер, время изменения и хеш содержимого книги; None, если файл недоступен"""
+        try:
+            stat = os.stat(file_path)
+            digest = hashlib.sha1()
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            return {
+                "path": os.path.abspath(file_path),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "content_hash": digest.hexdigest()
+            }
+        except OSError as e:
+            print(f"Не удалось прочитать файл '{file_path}' для кэша: {e}")
+            return None
+
+    def entry_path(self, signature: Dict[str, object]) -> str:
+        """Путь к записи кэша для версии книги.
+
+        Имя включает хеш содержимого: новая версия пишется в новый файл, и запись,
+        которая еще отображена в память, не приходится перезаписывать.
+        """
+        return os.path.join(self.cache_dir, self._path_key(signature["path"]) + "-"
+                            + str(signature["content_hash"])[:16] + self.ENTRY_EXTENSION)
+
+    def get(self, signature: Dict[str, object], text_processor: TextProcessor, arrow_backed: bool = False
+            ) -> Optional[Tuple[pd.DataFrame, int, bool, ColumnStore]]:
+        """Возвращает (таблица, индекс колонки номеров, добавлена ли она, ColumnStore) или None.
+
+        При arrow_backed=True строковые колонки остаются массивами Arrow, отображенными
+        из файла кэша; иначе они загружаются в память так же, как после чтения книги.
+        """
+        if not self.enabled:
+            return None
+        path = self.entry_path(signature)
+        if not os.path.exists(path):
+            return None
+        try:
+            table = feather.read_table(path, memory_map=True)
+            metadata = json.loads(table.schema.metadata[self._METADATA_KEY].decode("utf-8"))
+            if metadata.get("format") != self.FORMAT_VERSION or metadata.get("source") != signature:
+                return None
+
+            columns = metadata["columns"]
+            df = self._read_frame(table, self._TABLE_PREFIX, columns, arrow_backed)
+            normalized_df = self._read_frame(table, self._NORMALIZED_PREFIX, columns, arrow_backed)
+            profiles = {col: ColumnProfile.from_dict(metadata["profiles"][col]) for col in columns}
+            numeric_values = {
+                col: table.column(self._NUMERIC_PREFIX + col).to_numpy().astype(float)
+                for col in metadata["numeric_columns"]
+            }
+            date_values = {
+                col: table.column(self._DATE_PREFIX + col).to_pandas().to_numpy(dtype="datetime64[ns]")
+                for col in metadata["date_columns"]
+            }
+            column_store = ColumnStore(text_processor)
+            column_store.restore(normalized_df, profiles, numeric_values, date_values)
+
+            # Отмечаем использование записи для вытеснения давно не использованных
+            os.utime(path)
+            return df, metadata["num_col_index"], metadata["num_column_added"], column_store
+        except Exception as e:
+            print(f"Не удалось прочитать кэш таблицы '{path}': {e}")
+            return None
+
+    def put(self, signature: Dict[str, object], df: pd.DataFrame, num_col_index: int,
+            num_column_added: bool, column_store: ColumnStore) -> bool:
+        """Сохраняет обработанную таблицу; при ошибке кэш просто не используется"""
+        if not self.enabled:
+            return False
+        path = self.entry_path(signature)
+        temp_path = f"{path}.tmp"
+        try:
+            columns = [str(col) for col in df.columns]
+            arrays = {}
+            for col in columns:
+                arrays[self._TABLE_PREFIX + col] = self._string_array(df[col])
+                arrays[self._NORMALIZED_PREFIX + col] = self._string_array(column_store.normalized(col))
+            for col, numeric_index in column_store.numeric_indexes.items():
+                arrays[self._NUMERIC_PREFIX + col] = pa.array(numeric_index.values, type=pa.float64())
+            for col, date_index in column_store.date_indexes.items():
+                arrays[self._DATE_PREFIX + col] = pa.array(date_index.values, type=pa.timestamp("ns"))
+
+            metadata = {
+                "format": self.FORMAT_VERSION,
+                "source": signature,
+                "columns": columns,
+                "num_col_index": int(num_col_index),
+                "num_column_added": bool(num_column_added),
+                "profiles": {col: profile.to_dict() for col, profile in column_store.profiles.items()},
+                "numeric_columns": list(column_store.numeric_indexes),
+                "date_columns": list(column_store.date_indexes)
+            }
+            table = pa.table(arrays).replace_schema_metadata(
+                {self._METADATA_KEY: json.dumps(metadata, ensure_ascii=False).encode("utf-8")}
+            )
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            feather.write_feather(table, temp_path, compression="uncompressed")
+            os.replace(temp_path, path)
+            self._remove_other_versions(signature, keep_path=path)
+            self._evict(keep_path=path)
+            return True
+        except Exception as e:
+            print(f"Не удалось сохранить кэш таблицы '{path}': {e}")
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return False
+
+    def clear(self) -> None:
+        """Удаляет все записи кэша"""
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _path_key(source_path: str) -> str:
+        return hashlib.sha1(os.path.abspath(str(source_path)).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _string_array(values: pd.Series):
+        """Колонка для записи: категории — словарным кодированием, остальное — строками"""
+        if ColumnTypes.is_categorical(values):
+            return pa.DictionaryArray.from_arrays(
+                pa.array(values.cat.codes.to_numpy(), type=pa.int32()),
+                pa.array(values.cat.categories.astype(str).to_numpy(dtype=object), type=pa.string())
+            )
+        return pa.array(values.to_numpy(dtype=object), type=pa.string())
+
+    @staticmethod
+    def _arrow_types(arrow_type):
+        # Словарные колонки становятся pandas Categorical, остальные остаются в Arrow
+        return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+    def _read_frame(self, table, prefix: str, columns, arrow_backed: bool) -> pd.DataFrame:
+        selected = table.select([prefix + col for col in columns])
+        if arrow_backed:
+            # Колонки ссылаются на буферы Arrow без копирования в объекты Python
+            frame = selected.to_pandas(types_mapper=self._arrow_types)
+            frame.columns = columns
+            return frame
+        frame = selected.to_pandas()
+        frame.columns = columns
+        # Тот же тип колонок, что и после astype(str) при чтении книги
+        for col in columns:
+            if not ColumnTypes.is_categorical(frame[col]):
+                frame[col] = frame[col].astype(str)
+        return frame
+
+    def _entries(self):
+        """Записи кэша: (путь, размер, время последнего использования)"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.ENTRY_EXTENSION):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _remove_other_versions(self, signature: Dict[str, object], keep_path: str) -> None:
+        """Удаляет записи прежних версий той же книги (занятые файлы останутся до вытеснения)"""
+        prefix = self._path_key(signature["path"]) + "-"
+        for path, _, _ in self._entries():
+            if path != keep_path and os.path.basename(path).startswith(prefix):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _evict(self, keep_path: str) -> None:
+        """Удаляет давно не использованные записи, пока папка не уложится в max_bytes"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep_path:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
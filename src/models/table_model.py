@@ -1,20 +1,73 @@
-from typing import Any, Optional
-from PySide6.QtCore import Qt, QAbstractTableModel
+import bisect
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
 class SmartTableModel(QAbstractTableModel):
-    def __init__(self, df: Optional[pd.DataFrame] = None, num_mode: str = "excel", num_col_index: int = 0):
+    """Модель таблицы поверх одной исходной таблицы.
+
+    Данные не копируются: фильтр и сортировка задаются массивом _rows
+    с позициями строк исходной таблицы в порядке отображения.
+    Отображаемые строки колонок кэшируются массивами и заполняются при первом обращении;
+    колонки, хранящиеся в Arrow, читаются по ячейкам без создания строк для всей колонки.
+    Для каждой колонки один раз вычисляется перестановка сортировки по возрастанию;
+    сортировка по убыванию использует ее в обратном порядке.
+    Строки передаются представлению порциями по fetch_batch_size (canFetchMore/fetchMore),
+    fetch_batch_size <= 0 отключает порционную загрузку.
+    При потоковой загрузке дочитанные порции хранятся отдельно и приклеиваются
+    к исходной таблице один раз, когда она нужна целиком.
+    """
+
+    DEFAULT_FETCH_BATCH_SIZE = 1000
+
+    def __init__(self, df: Optional[pd.DataFrame] = None, num_mode: str = "excel", num_col_index: int = 0,
+                 sort_key_provider: Optional[Callable[[str], Optional[np.ndarray]]] = None,
+                 fetch_batch_size: int = DEFAULT_FETCH_BATCH_SIZE):
         super().__init__()
         self._df = df if df is not None else pd.DataFrame()
-        self._filtered_df = self._df.copy()
+        self._rows = np.arange(len(self._df))
+        self.fetch_batch_size = fetch_batch_size
+        self._loaded_count = self._initial_loaded_count()
+        self._display_columns: List[Optional[np.ndarray]] = [None] * len(self._df.columns)
+        self._arrow_columns: Dict[int, Optional[object]] = {}  # Колонка -> массив pyarrow или None
+        # Колонка -> (позиции непустых ключей по возрастанию, позиции пустых ключей)
+        self._sort_orders: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        # Дочитанные порции и позиции их первых строк в исходной таблице
+        self._pending_chunks: List[pd.DataFrame] = []
+        self._pending_starts: List[int] = []
         self.num_mode = num_mode
         self.num_col_index = num_col_index
+        # Возвращает типизированный ключ сортировки колонки по позициям строк исходной таблицы
+        self.sort_key_provider = sort_key_provider
 
     def rowCount(self, parent=None) -> int:
-        return len(self._filtered_df)
+        # Представлению видны только уже переданные строки
+        return self._loaded_count
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        if parent is not None and parent.isValid():
+            return False
+        return self._loaded_count < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        if parent is not None and parent.isValid():
+            return
+        remaining = len(self._rows) - self._loaded_count
+        count = remaining if self.fetch_batch_size <= 0 else min(self.fetch_batch_size, remaining)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded_count, self._loaded_count + count - 1)
+        self._loaded_count += count
+        self.endInsertRows()
 
     def columnCount(self, parent=None) -> int:
-        return len(self._filtered_df.columns)
+        return len(self._df.columns)
 
     def data(self, index, role=Qt.DisplayRole) -> Any:
         if not index.isValid():
@@ -22,23 +75,33 @@ class SmartTableModel(QAbstractTableModel):
         if role == Qt.DisplayRole:
             if index.column() == self.num_col_index and self.num_mode == "order":
                 return str(index.row() + 1)
-            return str(self._filtered_df.iloc[index.row(), index.column()])
+            position = self._rows[index.row()]
+            if position >= len(self._df):
+                return self._pending_cell(position, index.column())
+            arrow_column = self._arrow_column(index.column())
+            if arrow_column is not None:
+                # Строка Python создается только для запрошенной ячейки
+                value = arrow_column[position].as_py()
+                return "" if value is None else str(value)
+            return self._display_column(index.column())[position]
         return None
 
     def sort(self, column: int, order: Qt.SortOrder) -> None:
+        self._flush_pending_chunks()
         self.beginResetModel()
-        ascending = order == Qt.AscendingOrder
-        col_name = self._df.columns[column]
-        if column == self.num_col_index and col_name.lower().strip() in ["excel #", "№"]:
-            try:
-                self._df[col_name] = pd.to_numeric(self._df[col_name], errors="coerce")
-            except Exception:
-                pass
-            self._df.sort_values(by=col_name, ascending=ascending, inplace=True, kind="mergesort")
-            self._df[col_name] = self._df[col_name].astype(str)
+        ascending_order, missing = self._sort_order(column)
+        # Пустые ключи остаются в конце при любом направлении
+        if order == Qt.AscendingOrder:
+            permutation = np.concatenate((ascending_order, missing))
         else:
-            self._df.sort_values(by=col_name, ascending=ascending, inplace=True, kind="mergesort")
-        self._filtered_df = self._df.copy()
+            permutation = np.concatenate((ascending_order[::-1], missing))
+        if len(self._rows) != len(permutation):
+            # Отображается подмножество строк: оставляем из перестановки только его
+            in_view = np.zeros(len(self._df), dtype=bool)
+            in_view[self._rows] = True
+            permutation = permutation[in_view[permutation]]
+        self._rows = permutation
+        self._loaded_count = self._initial_loaded_count()
         self.endResetModel()
 
     def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.DisplayRole) -> Any:
@@ -59,7 +122,11 @@ class SmartTableModel(QAbstractTableModel):
 
     def setData(self, index, value: Any, role=Qt.EditRole) -> bool:
         if role == Qt.EditRole:
-            self._df.iloc[index.row(), index.column()] = value
+            self._flush_pending_chunks()
+            self._df.iat[self._rows[index.row()], index.column()] = value
+            self._display_columns[index.column()] = None
+            self._sort_orders.pop(index.column(), None)
+            self._arrow_columns.pop(index.column(), None)
             self.dataChanged.emit(index, index)
             return True
         return False
@@ -68,12 +135,21 @@ class SmartTableModel(QAbstractTableModel):
         return Qt.ItemIsEnabled | Qt.ItemIsSelectable
 
     def get_dataframe(self) -> pd.DataFrame:
-        return self._df.copy()
+        self._flush_pending_chunks()
+        """Возвращает отображаемые строки в текущем порядке"""
+        return self._df.iloc[self._rows]
 
-    def set_dataframe(self, df: pd.DataFrame) -> None:
+    def set_dataframe(self, df: pd.DataFrame, rows: Optional[np.ndarray] = None) -> None:
+        """Задает исходную таблицу (без копирования) и, при необходимости, отображаемые строки"""
         self.beginResetModel()
-        self._df = df.copy()
-        self._filtered_df = df.copy()
+        self._df = df
+        self._pending_chunks = []
+        self._pending_starts = []
+        self._rows = np.arange(len(df)) if rows is None else np.asarray(rows, dtype=np.int64)
+        self._loaded_count = self._initial_loaded_count()
+        self._display_columns = [None] * len(df.columns)
+        self._sort_orders = {}
+        self._arrow_columns = {}
         if "Excel #" in df.columns:
             self.num_col_index = df.columns.get_loc("Excel #")
         elif "№" in df.columns:
@@ -82,23 +158,210 @@ class SmartTableModel(QAbstractTableModel):
             self.num_col_index = 0
         self.endResetModel()
 
+    def set_rows(self, rows: np.ndarray) -> None:
+        """Показывает строки исходной таблицы с указанными позициями"""
+        self.beginResetModel()
+        self._rows = np.asarray(rows, dtype=np.int64)
+        self._loaded_count = self._initial_loaded_count()
+        self.endResetModel()
+
+    def append_row(self, df: pd.DataFrame) -> None:
+        """Исходная таблица пополнилась строкой в конце; строка добавляется в конец отображения"""
+        self._sort_orders = {}
+        self._arrow_columns = {}
+        position = len(df) - 1
+        view_row = len(self._rows)
+        # Если не все строки переданы представлению, новая строка появится при очередном fetchMore
+        visible = self._loaded_count == view_row
+        if visible:
+            self.beginInsertRows(QModelIndex(), view_row, view_row)
+        self._df = df
+        self._rows = np.append(self._rows, position)
+        for column_index, display in enumerate(self._display_columns):
+            if display is not None:
+                self._display_columns[column_index] = np.append(display, str(df.iat[position, column_index]))
+        if visible:
+            self._loaded_count += 1
+            self.endInsertRows()
+
+    def extend_rows(self, chunk: pd.DataFrame) -> None:
+        """В конец исходной таблицы дочитаны новые строки (потоковая загрузка).
+
+        Порция не копируется в исходную таблицу: ее ячейки читаются из нее самой.
+        Новые строки добавляются в конец отображения; представлению сразу передается
+        не больше первой порции, остальные — через fetchMore.
+        """
+        if len(chunk) == 0:
+            return
+        start = self._row_total()
+        self._pending_chunks.append(chunk)
+        self._pending_starts.append(start)
+        self._sort_orders = {}
+        self._rows = np.concatenate((self._rows, np.arange(start, start + len(chunk))))
+
+        target = self._initial_loaded_count()
+        if target > self._loaded_count:
+            self.beginInsertRows(QModelIndex(), self._loaded_count, target - 1)
+            self._loaded_count = target
+            self.endInsertRows()
+
+    def replace_base(self, df: pd.DataFrame) -> None:
+        """Исходная таблица заменена окончательной с теми же строками (конец потоковой загрузки).
+
+        Порядок и фильтр отображения сохраняются, кэши колонок строятся заново.
+        """
+        self._pending_chunks = []
+        self._pending_starts = []
+        self._df = df
+        self._display_columns = [None] * len(df.columns)
+        self._sort_orders = {}
+        self._arrow_columns = {}
+        if len(self._rows) and self._rows.max() >= len(df):
+            self._rows = self._rows[self._rows < len(df)]
+            self._loaded_count = min(self._loaded_count, len(self._rows))
+        self.layoutChanged.emit()
+
+    def update_row(self, position: int) -> None:
+        """Строка исходной таблицы изменена на месте; перерисовываются только ее ячейки"""
+        self._sort_orders = {}
+        self._arrow_columns = {}
+        for column_index, display in enumerate(self._display_columns):
+            if display is not None:
+                display[position] = str(self._df.iat[position, column_index])
+        for view_row in np.flatnonzero(self._rows[:self._loaded_count] == position):
+            self.dataChanged.emit(self.index(int(view_row), 0), self.index(int(view_row), self.columnCount() - 1))
+
+    def remove_row(self, position: int, df: pd.DataFrame) -> None:
+        """Строка удалена из исходной таблицы; позиции последующих строк сдвигаются на одну"""
+        self._sort_orders = {}
+        self._arrow_columns = {}
+        view_rows = np.flatnonzero(self._rows == position)
+        for view_row in view_rows[::-1]:
+            if view_row < self._loaded_count:
+                self.beginRemoveRows(QModelIndex(), int(view_row), int(view_row))
+                self._rows = np.delete(self._rows, view_row)
+                self._loaded_count -= 1
+                self.endRemoveRows()
+            else:
+                self._rows = np.delete(self._rows, view_row)
+        self._rows = np.where(self._rows > position, self._rows - 1, self._rows)
+        self._df = df
+        for column_index, display in enumerate(self._display_columns):
+            if display is not None:
+                self._display_columns[column_index] = np.delete(display, position)
+
+    def _initial_loaded_count(self) -> int:
+        if self.fetch_batch_size <= 0:
+            return len(self._rows)
+        return min(self.fetch_batch_size, len(self._rows))
+
+    def _row_total(self) -> int:
+        if self._pending_chunks:
+            return self._pending_starts[-1] + len(self._pending_chunks[-1])
+        return len(self._df)
+
+    def _pending_cell(self, position: int, column_index: int) -> str:
+        """Строка для ячейки из еще не приклеенной порции"""
+        chunk_index = bisect.bisect_right(self._pending_starts, position) - 1
+        chunk = self._pending_chunks[chunk_index]
+        return str(chunk.iat[position - self._pending_starts[chunk_index], column_index])
+
+    def _flush_pending_chunks(self) -> None:
+        """Приклеивает дочитанные порции к исходной таблице одним concat"""
+        if not self._pending_chunks:
+            return
+        chunks = self._pending_chunks
+        self._df = pd.concat([self._df, *chunks])
+        for column_index, display in enumerate(self._display_columns):
+            if display is not None:
+                tails = [chunk.iloc[:, column_index].astype(str).to_numpy(dtype=object) for chunk in chunks]
+                self._display_columns[column_index] = np.concatenate((display, *tails))
+        self._pending_chunks = []
+        self._pending_starts = []
+        self._sort_orders = {}
+        self._arrow_columns = {}
+
+    def _sort_order(self, column_index: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Перестановка сортировки по возрастанию для всех строк исходной таблицы (кэшируется)"""
+        cached = self._sort_orders.get(column_index)
+        if cached is not None:
+            return cached
+
+        col_name = self._df.columns[column_index]
+        sort_key = self.sort_key_provider(col_name) if self.sort_key_provider is not None else None
+        if sort_key is not None:
+            # Числа и даты — значения, разобранные при загрузке
+            keys = np.asarray(sort_key)
+            missing = np.isnat(keys) if keys.dtype.kind == "M" else np.isnan(keys)
+        elif column_index == self.num_col_index and col_name.lower().strip() in ["excel #", "№"]:
+            keys = pd.to_numeric(self._df.iloc[:, column_index], errors="coerce").to_numpy(dtype=float)
+            missing = np.isnan(keys)
+        else:
+            # Текст сравнивается без учета регистра; колонки Arrow сортируются средствами Arrow
+            series = self._df.iloc[:, column_index]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Категории: сравниваем только словарь, строки упорядочиваем по рангам кодов
+                categories = pd.Series(series.cat.categories.astype(str)).str.casefold()
+                ranks = np.append(pd.factorize(categories, sort=True)[0], -1)
+                keys = pd.Series(ranks[series.cat.codes.to_numpy()])
+            elif self._arrow_column(column_index) is not None:
+                keys = self._df.iloc[:, column_index].reset_index(drop=True).str.casefold()
+            else:
+                keys = pd.Series(self._display_column(column_index)).str.casefold()
+            cached = self._sort_orders[column_index] = (
+                keys.argsort(kind="stable").to_numpy(), np.empty(0, dtype=np.int64)
+            )
+            return cached
+
+        valid = np.flatnonzero(~missing)
+        ascending_order = valid[np.argsort(keys[valid], kind="stable")]
+        cached = self._sort_orders[column_index] = (ascending_order, np.flatnonzero(missing))
+        return cached
+
+    def _arrow_column(self, column_index: int):
+        """Массив Arrow колонки, если она хранится в Arrow (например, отображена из кэша)"""
+        if column_index not in self._arrow_columns:
+            arrow_column = None
+            series = self._df.iloc[:, column_index]
+            if pa is not None and (isinstance(series.dtype, pd.ArrowDtype)
+                                   or getattr(series.dtype, "storage", None) == "pyarrow"):
+                arrow_column = pa.array(series.array)
+            self._arrow_columns[column_index] = arrow_column
+        return self._arrow_columns[column_index]
+
+    def _display_column(self, column_index: int) -> np.ndarray:
+        """Строки для отображения всей колонки исходной таблицы (строятся один раз)"""
+        display = self._display_columns[column_index]
+        if display is None:
+            series = self._df.iloc[:, column_index]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Строки словаря переводятся один раз и раскладываются по кодам (код -1 — пусто)
+                categories = series.cat.categories.astype(str).to_numpy(dtype=object)
+                display = np.append(categories, "nan")[series.cat.codes.to_numpy()]
+            else:
+                display = series.astype(str).to_numpy(dtype=object)
+            self._display_columns[column_index] = display
+        return display
+
     def get_column_data(self, column_index: int) -> pd.Series:
-        return self._df.iloc[:, column_index]
+        self._flush_pending_chunks()
+        return self._df.iloc[self._rows, column_index]
         
     def get_real_row_id(self, row_index: int) -> str:
         """Получает реальный ID строки независимо от режима отображения."""
-        if row_index < 0 or row_index >= len(self._filtered_df):
+        if row_index < 0 or row_index >= len(self._rows):
             return ""
         
         # Ищем колонку с ID
         id_col = None
-        for col in self._filtered_df.columns:
+        for col_index, col in enumerate(self._df.columns):
             if col.lower() in ["excel #", "№"]:
-                id_col = col
+                id_col = col_index
                 break
         
         if id_col is None:
             return ""
         
-        # Возвращаем реальное значение ID из DataFrame
-        return str(self._filtered_df.iloc[row_index][id_col])
\ No newline at end of file
+        # Возвращаем реальное значение ID из исходной таблицы
+        self._flush_pending_chunks()
+        return str(self._df.iat[self._rows[row_index], id_col])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from PySide6.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QHBoxLayout, QLabel, QPushButton, QWidget, QCompleter
+from PySide6.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QHBoxLayout, QLabel, QPushButton, QWidget, QCompleter, QProgressBar
 from PySide6.QtCore import Qt, QPropertyAnimation, QSize
 from PySide6.QtGui import QIcon
 from ui.Main.main_ui import Ui_MainWindow
@@ -17,6 +17,7 @@ class MainWindow(QMainWindow):
 
         self._init_search_panel()
         self._init_custom_widgets()
+        self._init_load_indicator()
         self._init_controllers()
         self._connect_signals()
         self._search_panel_pinned = False
@@ -93,6 +94,21 @@ class MainWindow(QMainWindow):
         self.ui.btnSmartSearch.setMinimumWidth(self.ui.btnReset.minimumWidth())
         self.ui.btnSmartSearch.setMinimumHeight(self.ui.btnReset.minimumHeight())
 
+    def _init_load_indicator(self):
+        # Ход фоновой загрузки показывается в строке состояния, не блокируя окно
+        self.load_label = QLabel()
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(200)
+        self.load_progress.setTextVisible(False)
+        self.btn_cancel_load = QPushButton("Отмена")
+        self.btn_cancel_load.clicked.connect(self._cancel_loading)
+        
+        status_bar = self.statusBar()
+        status_bar.addPermanentWidget(self.load_label)
+        status_bar.addPermanentWidget(self.load_progress)
+        status_bar.addPermanentWidget(self.btn_cancel_load)
+        self._set_load_indicator_visible(False)
+
     def _init_controllers(self):
         self.table_controller = TableController(self.table_view)
         self.filter_controller = FilterController(
@@ -117,19 +133,65 @@ class MainWindow(QMainWindow):
         # Подключаем сигналы таблицы
         self.table_view.sortRequested.connect(self.table_controller.sort_column)
         self.table_view.numberModeChanged.connect(self.table_controller.toggle_number_mode)
+        
+        # Подключаем сигналы фоновой загрузки файла
+        self.table_controller.loadProgress.connect(self._on_load_progress)
+        self.table_controller.loadFinished.connect(self._on_load_finished)
 
     def _load_excel(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Открыть Excel файл", "", "Excel Files (*.xlsx *.xls)"
         )
         if file_path:
-            if self.table_controller.load_file(file_path):
-                self.filter_controller.update_columns(self.table_controller.get_columns())
-            else:
-                QMessageBox.warning(
-                    self, "Ошибка",
-                    "Не удалось загрузить файл. Проверьте формат или структуру таблицы."
-                )
+            # Файл читается в фоне, окно остается отзывчивым
+            self.load_label.setText("Загрузка файла...")
+            self.load_progress.setRange(0, 0)
+            self._set_load_indicator_visible(True)
+            self._set_actions_enabled(False)
+            self.table_controller.start_loading(file_path)
+
+    def _on_load_progress(self, phase: str, done: int, total: int):
+        if self.load_progress.isHidden():
+            return
+        if total:
+            text = f"{phase}: {done} из {total}"
+        elif done:
+            text = f"{phase}: прочитано строк {done}"
+        else:
+            text = f"{phase}..."
+        self.load_label.setText(text)
+        self.load_progress.setRange(0, total)
+        self.load_progress.setValue(done)
+
+    def _on_load_finished(self, success: bool):
+        self._close_load_progress()
+        if success:
+            self.filter_controller.update_columns(self.table_controller.get_columns())
+        else:
+            QMessageBox.warning(
+                self, "Ошибка",
+                "Не удалось загрузить файл. Проверьте формат или структуру таблицы."
+            )
+
+    def _cancel_loading(self):
+        self.table_controller.cancel_loading()
+        self._close_load_progress()
+
+    def _close_load_progress(self):
+        self._set_actions_enabled(True)
+        self._set_load_indicator_visible(False)
+
+    def _set_actions_enabled(self, enabled: bool):
+        # Пока файл загружается, таблица DataProcessor еще прежняя: фильтры и правка недоступны
+        self.ui.btnLoad.setEnabled(enabled)
+        self.ui.btnAddRecord.setEnabled(enabled)
+        self.ui.btnReset.setEnabled(enabled)
+        self.btn_search.setEnabled(enabled)
+
+    def _set_load_indicator_visible(self, visible: bool):
+        self.load_label.setVisible(visible)
+        self.load_progress.setVisible(visible)
+        self.btn_cancel_load.setVisible(visible)
 
     def _toggle_search_panel(self):
         if self._search_panel_pinned:
@@ -190,6 +252,8 @@ class MainWindow(QMainWindow):
     # Метод для добавления записи в MainWindow
     def _show_add_record_dialog(self, record_data=None):
         """Метод для добавления или редактирования записи."""
+        if self.table_controller.is_loading():
+            return
         if self.table_controller.model is None:
             QMessageBox.warning(self, "Предупреждение", "Сначала загрузите Excel файл.")
             return
@@ -266,7 +330,7 @@ class MainWindow(QMainWindow):
 
     def _delete_record(self, row_id):
         """Удаление записи по ID."""
-        if self.table_controller.model is None:
+        if self.table_controller.model is None or self.table_controller.is_loading():
             return
             
         # Удаляем запись по ID
@@ -56,6 +56,12 @@ class SmartTableView(QTableView):
         edit_action = menu.addAction("✏️ Редактировать запись")
         delete_action = menu.addAction("❌ Удалить запись")
         
+        # Во время загрузки файла записи не редактируются
+        main_window = self.window()
+        if hasattr(main_window, 'table_controller') and main_window.table_controller.is_loading():
+            edit_action.setEnabled(False)
+            delete_action.setEnabled(False)
+        
         action = menu.exec(self.viewport().mapToGlobal(position))
 
         if action == preview_action:
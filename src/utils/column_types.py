@@ -0,0 +1,158 @@
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+class ColumnTypes:
+    """Типы колонок и векторизованный разбор значений"""
+
+    INTEGER = "integer"
+    FLOAT = "float"
+    DATE = "date"
+    CATEGORICAL = "categorical"
+    TEXT = "text"
+
+    NUMERIC = (INTEGER, FLOAT)
+
+    # Форматы дат, встречающиеся в таблицах (включая даты Excel, приведенные к строке)
+    DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d.%m.%y", "%d/%m/%Y")
+
+    # Колонка считается категориальной, если различных значений не больше
+    # CATEGORICAL_MAX_UNIQUE и не больше CATEGORICAL_MAX_RATIO от числа непустых значений
+    CATEGORICAL_MAX_UNIQUE = 1000
+    CATEGORICAL_MAX_RATIO = 0.5
+
+    @staticmethod
+    def parse_numbers(values: pd.Series) -> pd.Series:
+        """Преобразует строки в числа; неразобранные и пустые значения становятся NaN"""
+        # Разбираем только различные значения и раскладываем результат по строкам
+        codes, uniques = pd.factorize(values.astype(str).str.strip())
+        numbers = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").to_numpy(dtype=float)
+        result = numbers[codes] if len(numbers) else np.full(len(codes), np.nan)
+        return pd.Series(result, index=values.index, dtype=float)
+
+    @staticmethod
+    def parse_dates(values: pd.Series) -> pd.Series:
+        """Преобразует строки в даты по известным форматам; неразобранные значения становятся NaT"""
+        stripped = values.astype(str).str.strip()
+        result = pd.Series(pd.NaT, index=values.index, dtype="datetime64[ns]")
+        for date_format in ColumnTypes.DATE_FORMATS:
+            missing = result.isna() & (stripped != "")
+            if not missing.any():
+                break
+            result[missing] = pd.to_datetime(stripped[missing], format=date_format, errors="coerce")
+        return result
+
+    @staticmethod
+    def is_categorical(values: pd.Series) -> bool:
+        return isinstance(values.dtype, pd.CategoricalDtype)
+
+    @staticmethod
+    def add_category(df: pd.DataFrame, column: str, value: str) -> None:
+        """Добавляет значение в словарь категориальной колонки, чтобы его можно было записать"""
+        values = df[column]
+        if ColumnTypes.is_categorical(values) and value not in values.cat.categories:
+            df[column] = values.cat.add_categories([value])
+
+    @staticmethod
+    def parse_number(value: str) -> Optional[float]:
+        number = pd.to_numeric(str(value).strip(), errors="coerce")
+        return None if pd.isna(number) else float(number)
+
+    @staticmethod
+    def parse_date(value: str) -> Optional[pd.Timestamp]:
+        parsed = ColumnTypes.parse_dates(pd.Series([value])).iloc[0]
+        return None if pd.isna(parsed) else parsed
+
+class ColumnProfile:
+    """Сводка по значениям колонки, по которой определяется ее тип.
+
+    Счетчики обновляются при каждой правке, поэтому тип не нужно выводить заново.
+    Различные значения отслеживаются, пока колонка может оставаться категориальной.
+    """
+
+    def __init__(self, values: pd.Series):
+        # Разбираем только различные значения, учитывая число их повторений
+        stripped = values.astype(str).str.strip()
+        counts = stripped[stripped != ""].value_counts()
+        distinct_values = pd.Series(counts.index.astype(str))
+        weights = counts.to_numpy()
+
+        numbers = ColumnTypes.parse_numbers(distinct_values).to_numpy()
+        is_number = ~np.isnan(numbers)
+        is_date = np.zeros(len(distinct_values), dtype=bool)
+        if not is_number.all():
+            is_date[~is_number] = ColumnTypes.parse_dates(distinct_values[~is_number]).notna().to_numpy()
+
+        self.non_empty = int(weights.sum())
+        self.non_numeric = int(weights[~is_number].sum())
+        self.non_integer = int(weights[is_number & (np.nan_to_num(numbers) % 1 != 0)].sum())
+        self.non_date = self.non_empty - int(weights[is_date].sum())
+
+        self.distinct: Optional[Dict[str, int]] = None
+        if len(distinct_values) <= ColumnTypes.CATEGORICAL_MAX_UNIQUE:
+            self.distinct = dict(zip(distinct_values.tolist(), weights.tolist()))
+
+    def to_dict(self) -> dict:
+        """Счетчики профиля для сохранения в кэш"""
+        return {
+            "non_empty": self.non_empty,
+            "non_numeric": self.non_numeric,
+            "non_integer": self.non_integer,
+            "non_date": self.non_date,
+            "distinct": self.distinct
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ColumnProfile":
+        """Восстанавливает профиль из to_dict() без разбора значений"""
+        profile = cls.__new__(cls)
+        profile.non_empty = int(data["non_empty"])
+        profile.non_numeric = int(data["non_numeric"])
+        profile.non_integer = int(data["non_integer"])
+        profile.non_date = int(data["non_date"])
+        profile.distinct = data.get("distinct")
+        return profile
+
+    @property
+    def column_type(self) -> str:
+        if self.non_empty == 0:
+            return ColumnTypes.TEXT
+        if self.non_numeric == 0:
+            return ColumnTypes.INTEGER if self.non_integer == 0 else ColumnTypes.FLOAT
+        if self.non_date == 0:
+            return ColumnTypes.DATE
+        if self.distinct is not None and len(self.distinct) <= ColumnTypes.CATEGORICAL_MAX_RATIO * self.non_empty:
+            return ColumnTypes.CATEGORICAL
+        return ColumnTypes.TEXT
+
+    def add_value(self, value: str) -> None:
+        self._apply(value, 1)
+
+    def remove_value(self, value: str) -> None:
+        self._apply(value, -1)
+
+    def _apply(self, value: str, delta: int) -> None:
+        value = str(value).strip()
+        if not value:
+            return
+        self.non_empty += delta
+
+        number = ColumnTypes.parse_number(value)
+        if number is None:
+            self.non_numeric += delta
+            if ColumnTypes.parse_date(value) is None:
+                self.non_date += delta
+        else:
+            # Числа не считаются датами
+            self.non_date += delta
+            if number % 1 != 0:
+                self.non_integer += delta
+
+        if self.distinct is not None:
+            count = self.distinct.get(value, 0) + delta
+            if count > 0:
+                self.distinct[value] = count
+            else:
+                self.distinct.pop(value, None)
+            if len(self.distinct) > ColumnTypes.CATEGORICAL_MAX_UNIQUE:
+                self.distinct = None
@@ -0,0 +1,37 @@
+from typing import Dict, List
+
+class DisjointSet:
+    """Система непересекающихся множеств (union-find) для объединения элементов 0..n-1"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.size = [1] * size
+
+    def find(self, item: int) -> int:
+        """Возвращает корень множества, сокращая путь по ходу поиска"""
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> int:
+        """Объединяет множества двух элементов и возвращает корень результата"""
+        root_first = self.find(first)
+        root_second = self.find(second)
+        if root_first == root_second:
+            return root_first
+
+        # Подвешиваем меньшее дерево к большему
+        if self.size[root_first] < self.size[root_second]:
+            root_first, root_second = root_second, root_first
+        self.parent[root_second] = root_first
+        self.size[root_first] += self.size[root_second]
+        return root_first
+
+    def groups(self) -> Dict[int, List[int]]:
+        """Возвращает элементы каждого множества в порядке первого появления"""
+        result: Dict[int, List[int]] = {}
+        for item in range(len(self.parent)):
+            result.setdefault(self.find(item), []).append(item)
+        return result
@@ -0,0 +1,95 @@
+import os
+from typing import Iterator, List, Optional, Sequence
+import pandas as pd
+from openpyxl import load_workbook
+
+class ExcelStreamReader:
+    """Потоковое чтение первого листа xlsx через openpyxl в режиме read_only.
+
+    Строки выдаются порциями DataFrame со строковыми значениями (как после
+    fillna("") и astype(str)), поэтому в памяти не держится весь разобранный лист.
+    Первая порция небольшая, чтобы таблица появилась сразу; следующие удваиваются
+    до max_chunk_size.
+    """
+
+    FIRST_CHUNK_SIZE = 1000
+    MAX_CHUNK_SIZE = 50_000
+    SUPPORTED_EXTENSIONS = (".xlsx", ".xlsm")
+
+    def __init__(self, file_path: str, first_chunk_size: int = FIRST_CHUNK_SIZE,
+                 max_chunk_size: int = MAX_CHUNK_SIZE):
+        self.file_path = file_path
+        self.first_chunk_size = first_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.columns: List[str] = []
+        self.total_rows = 0  # Оценка по размерам листа; 0 — неизвестно
+
+    @staticmethod
+    def supports(file_path: str) -> bool:
+        return os.path.splitext(file_path)[1].lower() in ExcelStreamReader.SUPPORTED_EXTENSIONS
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        """Выдает порции строк; индекс порций продолжает нумерацию строк листа с нуля"""
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            self.total_rows = max((sheet.max_row or 1) - 1, 0)
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            self.columns = self._make_columns(header)
+            width = len(self.columns)
+            empty_row = (None,) * width
+
+            buffer: List[Sequence] = []
+            start = 0
+            chunk_size = self.first_chunk_size
+            pending_empty = 0  # Пустые строки выдаются, только если за ними есть данные
+            for row in rows:
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+                if all(value is None for value in row):
+                    pending_empty += 1
+                    continue
+                if pending_empty:
+                    buffer.extend([empty_row] * pending_empty)
+                    pending_empty = 0
+                buffer.append(row)
+                if len(buffer) >= chunk_size:
+                    yield self._to_frame(buffer, start)
+                    start += len(buffer)
+                    buffer = []
+                    chunk_size = min(chunk_size * 2, self.max_chunk_size)
+            if buffer:
+                yield self._to_frame(buffer, start)
+        finally:
+            workbook.close()
+
+    def empty_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(columns=self.columns, dtype=str)
+
+    def _to_frame(self, rows: List[Sequence], start: int) -> pd.DataFrame:
+        frame = pd.DataFrame.from_records(rows, columns=self.columns)
+        frame.index = pd.RangeIndex(start, start + len(rows))
+        frame = frame.fillna("")
+        for col in frame.columns:
+            frame[col] = frame[col].astype(str)
+        return frame
+
+    @staticmethod
+    def _make_columns(header: Sequence[Optional[object]]) -> List[str]:
+        """Имена колонок как у pandas: пустые — "Unnamed: N", повторы — "имя.1", "имя.2" """
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+        columns: List[str] = []
+        seen = {}
+        for position, name in enumerate(header):
+            name = f"Unnamed: {position}" if name is None else str(name)
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            columns.append(name)
+        return columns
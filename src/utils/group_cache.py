@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+class GroupCache:
+    """Кэш групп схожих значений в памяти и в служебном файле рядом с книгой Excel.
+
+    Запись для колонки действительна, только если совпадают хеш содержимого
+    колонки, порог схожести, движок и версия алгоритма группировки.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self._memory: Dict[Optional[str], Dict[str, dict]] = {}
+
+    @staticmethod
+    def content_hash(values: List[str]) -> str:
+        """Хеш упорядоченного списка значений колонки"""
+        digest = hashlib.sha1()
+        for value in values:
+            digest.update(str(value).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @staticmethod
+    def sidecar_path(file_path: str) -> str:
+        """Путь к служебному файлу кэша для книги Excel"""
+        file_dir = os.path.dirname(file_path)
+        file_name = os.path.basename(file_path)
+        return os.path.join(file_dir, f".{file_name}.groups.json")
+
+    def get(self, file_path: Optional[str], column: str, content_hash: str,
+            params: Dict[str, str]) -> Optional[Dict[str, Set[str]]]:
+        """Возвращает сохраненные группы или None, если кэш отсутствует или устарел"""
+        entries = self._entries(file_path)
+        entry = entries.get(column)
+        if entry is None or entry.get("content_hash") != content_hash or entry.get("params") != params:
+            return None
+        return {rep: set(values) for rep, values in entry["groups"].items()}
+
+    def put(self, file_path: Optional[str], column: str, content_hash: str,
+            params: Dict[str, str], groups: Dict[str, Set[str]]) -> None:
+        """Сохраняет группы колонки в памяти и в служебном файле"""
+        entries = self._entries(file_path)
+        entries[column] = {
+            "content_hash": content_hash,
+            "params": params,
+            "groups": {rep: sorted(values) for rep, values in groups.items()}
+        }
+        if file_path:
+            self._write_sidecar(file_path, entries)
+
+    def clear(self, file_path: Optional[str] = None) -> None:
+        """Очищает кэш в памяти для книги (или целиком)"""
+        if file_path is None:
+            self._memory.clear()
+        else:
+            self._memory.pop(file_path, None)
+
+    def _entries(self, file_path: Optional[str]) -> Dict[str, dict]:
+        if file_path not in self._memory:
+            self._memory[file_path] = self._read_sidecar(file_path) if file_path else {}
+        return self._memory[file_path]
+
+    def _read_sidecar(self, file_path: str) -> Dict[str, dict]:
+        path = self.sidecar_path(file_path)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != self.FORMAT_VERSION:
+                return {}
+            return data.get("columns", {})
+        except Exception as e:
+            print(f"Не удалось прочитать кэш групп '{path}': {e}")
+            return {}
+
+    def _write_sidecar(self, file_path: str, entries: Dict[str, dict]) -> None:
+        path = self.sidecar_path(file_path)
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"format": self.FORMAT_VERSION, "columns": entries}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except Exception as e:
+            # Папка может быть недоступна для записи — тогда кэш остается только в памяти
+            print(f"Не удалось сохранить кэш групп '{path}': {e}")
@@ -0,0 +1,64 @@
+import re
+from typing import Callable, List, Optional
+
+class RangeQuery:
+    """Условие фильтра по упорядоченной колонке (числа, даты).
+
+    Поддерживаемый синтаксис:
+        5            — равенство
+        > 5, >= 5, < 5, <= 5, = 5
+        between 1 and 10, между 1 и 10, от 1 до 10 — диапазон с границами
+        1; 2; 3      — список значений (запятая не разделяет: "1,5" — десятичная дробь, а не 1 и 5)
+    """
+
+    _COMPARISON_RE = re.compile(r"^(>=|<=|==|>|<|=)\s*(.+)$")
+    _BETWEEN_RE = re.compile(r"^(?:between|между|от)\s+(.+?)\s+(?:and|и|до)\s+(.+)$", re.IGNORECASE)
+    _LIST_SEPARATOR = ";"
+
+    def __init__(self, low=None, high=None, low_inclusive: bool = True, high_inclusive: bool = True,
+                 values: Optional[List] = None):
+        self.low = low
+        self.high = high
+        self.low_inclusive = low_inclusive
+        self.high_inclusive = high_inclusive
+        self.values = values  # Если задан — условие на вхождение в список
+
+    @staticmethod
+    def parse(text: str, parse_value: Callable[[str], Optional[object]]) -> Optional["RangeQuery"]:
+        """Разбирает строку фильтра; parse_value возвращает None для неразобранных значений.
+
+        Возвращает None, если строка не является условием для этой колонки.
+        """
+        text = str(text).strip()
+        if not text:
+            return None
+
+        match = RangeQuery._BETWEEN_RE.match(text)
+        if match:
+            low, high = parse_value(match.group(1)), parse_value(match.group(2))
+            if low is None or high is None:
+                return None
+            if low > high:
+                low, high = high, low
+            return RangeQuery(low=low, high=high)
+
+        match = RangeQuery._COMPARISON_RE.match(text)
+        if match:
+            operator, value = match.group(1), parse_value(match.group(2))
+            if value is None:
+                return None
+            if operator == ">":
+                return RangeQuery(low=value, low_inclusive=False)
+            if operator == ">=":
+                return RangeQuery(low=value)
+            if operator == "<":
+                return RangeQuery(high=value, high_inclusive=False)
+            if operator == "<=":
+                return RangeQuery(high=value)
+            return RangeQuery(values=[value])
+
+        parts = [part for part in text.split(RangeQuery._LIST_SEPARATOR) if part.strip()]
+        values = [parse_value(part) for part in parts]
+        if not values or any(value is None for value in values):
+            return None
+        return RangeQuery(values=values)
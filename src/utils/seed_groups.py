@@ -0,0 +1,82 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional
+from utils.text_processor import TextProcessor
+
+# Словарь канонических организаций, поставляемый с приложением
+DEFAULT_SEED_GROUPS_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "seed_groups.json"
+)
+
+class SeedGroups:
+    """Словарь канонических названий организаций с точными синонимами и паттернами.
+
+    Паттерны всех групп объединяются в одно регулярное выражение с именованными
+    альтернативами, а синонимы — в хеш-таблицу по нормализованному тексту,
+    поэтому каждый текст классифицируется за один проход.
+    """
+
+    def __init__(self, groups: List[Dict]):
+        self.names: List[str] = []
+        self.name_order: Dict[str, int] = {}
+        self._aliases: Dict[str, str] = {}
+        self._group_names: Dict[str, str] = {}
+
+        alternatives = []
+        for group in groups:
+            name = group["name"]
+            if name in self.name_order:
+                continue
+            self.name_order[name] = len(self.names)
+            self.names.append(name)
+
+            for alias in [name] + list(group.get("aliases", [])):
+                self._aliases.setdefault(TextProcessor.normalize(alias), name)
+
+            patterns = group.get("patterns", [])
+            if patterns:
+                group_name = f"seed{len(self.names) - 1}"
+                self._group_names[group_name] = name
+                alternatives.append(f"(?P<{group_name}>" + "|".join(f"(?:{p})" for p in patterns) + ")")
+
+        self._pattern = re.compile("|".join(alternatives)) if alternatives else None
+
+    @classmethod
+    def from_file(cls, path: str) -> "SeedGroups":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("groups", []))
+
+    def classify(self, text: str) -> Optional[str]:
+        """Возвращает каноническое название для текста или None"""
+        name = self._aliases.get(TextProcessor.normalize(text))
+        if name is not None:
+            return name
+        if self._pattern is not None:
+            match = self._pattern.search(str(text).lower())
+            if match is not None:
+                return self._group_names[match.lastgroup]
+        return None
+
+_loaded_seed_groups: Dict[str, SeedGroups] = {}
+
+def load_seed_groups(path: Optional[str] = None) -> SeedGroups:
+    """Загружает словарь групп из JSON-файла один раз на процесс.
+
+    Относительный путь отсчитывается от папки src. Если файл не удается прочитать,
+    возвращается пустой словарь.
+    """
+    if path is None:
+        path = DEFAULT_SEED_GROUPS_PATH
+    elif not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), path)
+    path = os.path.normpath(path)
+
+    if path not in _loaded_seed_groups:
+        try:
+            _loaded_seed_groups[path] = SeedGroups.from_file(path)
+        except Exception as e:
+            print(f"Не удалось загрузить словарь групп '{path}': {e}")
+            _loaded_seed_groups[path] = SeedGroups([])
+    return _loaded_seed_groups[path]
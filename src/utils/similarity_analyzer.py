@@ -1,12 +1,37 @@
-from typing import List, Dict, Set, Tuple
+from typing import List, Dict, Set, Tuple, Optional
 import numpy as np
+from scipy.sparse import csr_matrix, hstack
 from sklearn.feature_extraction.text import TfidfVectorizer
 from utils.text_processor import TextProcessor
+from utils.disjoint_set import DisjointSet
+from utils.seed_groups import SeedGroups, load_seed_groups
 import re
+import zlib
 
 class SimilarityAnalyzer:
-    def __init__(self, similarity_threshold: float = 0.75):
+    # Доступные движки поиска схожих пар. "tfidf" выбирается только явно: косинусная мера
+    # символьных n-грамм дает почти плотные блоки и медленнее точного движка "ngram"
+    ENGINES = ("ngram", "tfidf", "minhash")
+
+    # Версия алгоритма группировки: увеличивается при изменениях, влияющих на результат,
+    # чтобы сохраненные на диске группы считались устаревшими
+    ALGORITHM_VERSION = 4
+
+    # Короткие предлоги и союзы, не учитываемые в первых буквах значимых слов
+    _ABBR_IGNORE_WORDS = frozenset({'и', 'в', 'на', 'с', 'по', 'для', 'при', 'им', 'имени', 'of', 'the', 'a', 'an'})
+    
+    # Ключевые слова образовательных учреждений
+    _EDU_KEYWORDS = ('университет', 'институт', 'академия', 'колледж', 'школа', 'лицей', 'гимназия')
+
+    # Простое число Мерсенна для универсального хеширования MinHash
+    _MINHASH_PRIME = (1 << 61) - 1
+
+    def __init__(self, similarity_threshold: float = 0.75, engine: str = "ngram",
+                 minhash_bands: int = 16, minhash_rows: int = 4, seed_groups: Optional[SeedGroups] = None):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Неизвестный движок анализа схожести: {engine}")
         self.similarity_threshold = similarity_threshold
+        self.engine = engine
         self.text_processor = TextProcessor()
         
         # Векторизаторы для разных типов анализа
@@ -22,15 +47,34 @@ class SimilarityAnalyzer:
             min_df=1
         )
         
-        # Предопределенные группы для университетов
-        self.university_patterns = {
-            r'(?:уо\s+)?(?:[«"])?ггу(?:[»"])?\b|(?:уо\s+)?(?:[«"])?г(?:омельский)?\s*г(?:осударственный)?\s*у(?:ниверситет)?(?:[»"])?\b|(?:университет|унив)\s+(?:им\.?|имени)\s+(?:ф\.?\s*)?скорин': 'Гомельский государственный университет имени Франциска Скорины',
-            r'(?:уо\s+)?(?:[«"])?ггту(?:[»"])?\b|(?:уо\s+)?(?:[«"])?г(?:омельский)?\s*г(?:осударственный)?\s*т(?:ехнический)?\s*у(?:ниверситет)?(?:[»"])?\b|(?:университет|унив)\s+(?:им\.?|имени)\s+(?:п\.?о\.?\s*)?сух': 'Гомельский государственный технический университет имени П.О. Сухого',
-            r'(?:уо\s+)?(?:[«"])?гомгму(?:[»"])?\b|(?:уо\s+)?(?:[«"])?г(?:омельский)?\s*(?:г(?:осударственный)?)?\s*мед(?:ицинский)?\s*у(?:ниверситет)?(?:[»"])?': 'Гомельский государственный медицинский университет'
-        }
+        # Размер символьных n-грамм для меры схожести и поиска пар-кандидатов
+        self.ngram_size = 3
+        # Число строк в блоке при умножении разреженных матриц n-грамм
+        self.ngram_block_size = 256
+        
+        # Параметры движка TF-IDF: вес символьных признаков и размер блока строк
+        self.tfidf_char_weight = 0.7
+        self.tfidf_block_size = 128
+        
+        # Параметры MinHash/LSH: сигнатура из bands * rows хешей делится на полосы,
+        # тексты с совпадающей полосой становятся кандидатами
+        self.minhash_bands = minhash_bands
+        self.minhash_rows = minhash_rows
+        # Корзины LSH крупнее этого размера сравниваются только с первым элементом
+        self.minhash_max_bucket = 64
+        
+        # Словарь канонических названий организаций (по умолчанию — из resources/seed_groups.json)
+        self.seed_groups = seed_groups if seed_groups is not None else load_seed_groups()
     
-    def find_similar_groups(self, texts: List[str]) -> Dict[str, Set[str]]:
-        """Находит группы схожих текстов без привязки к конкретным данным"""
+    def find_similar_groups(self, texts: List[str], engine: Optional[str] = None) -> Dict[str, Set[str]]:
+        """Находит группы схожих текстов без привязки к конкретным данным.
+        
+        engine позволяет выбрать движок поиска схожих пар для этого вызова
+        ("ngram", "tfidf" или "minhash"); по умолчанию используется self.engine.
+        """
+        if engine is not None and engine not in self.ENGINES:
+            raise ValueError(f"Неизвестный движок анализа схожести: {engine}")
+
         if not texts:
             return {}
 
@@ -41,8 +85,8 @@ class SimilarityAnalyzer:
         if len(original_texts) <= 1:
             return {original_texts[0]: set(original_texts)} if original_texts else {}
         
-        # Шаг 0: Применяем предопределенные паттерны университетов
-        university_groups = self._apply_university_patterns(original_texts)
+        # Шаг 0: Относим тексты к каноническим организациям из словаря
+        seed_groups = self._apply_seed_groups(original_texts)
         
         # Шаг 1: Группируем тексты, которые идентичны после нормализации
         norm_groups = self._group_by_normalized_text(original_texts)
@@ -52,7 +96,7 @@ class SimilarityAnalyzer:
         
         # Шаг 3: Для оставшихся текстов применяем анализ схожести
         used_texts = set()
-        for groups in [university_groups, norm_groups, abbr_groups]:
+        for groups in [seed_groups, norm_groups, abbr_groups]:
             for group in groups.values():
                 used_texts.update(group)
         
@@ -62,13 +106,13 @@ class SimilarityAnalyzer:
         similarity_groups = {}
         if remaining_texts:
             try:
-                similarity_groups = self._analyze_with_similarity(remaining_texts)
+                similarity_groups = self._analyze_with_similarity(remaining_texts, engine or self.engine)
             except Exception as e:
                 print(f"Ошибка при анализе схожести: {e}")
         
         # Объединяем результаты всех методов
         all_groups = []
-        for groups in [university_groups, norm_groups, abbr_groups, similarity_groups]:
+        for groups in [seed_groups, norm_groups, abbr_groups, similarity_groups]:
             all_groups.extend([(rep, group) for rep, group in groups.items()])
         
         # Объединяем пересекающиеся группы
@@ -85,28 +129,24 @@ class SimilarityAnalyzer:
         
         return merged_groups
     
-    def _apply_university_patterns(self, texts: List[str]) -> Dict[str, Set[str]]:
-        """Применяет предопределенные паттерны для университетов"""
-        result = {}
-        for pattern, representative in self.university_patterns.items():
-            group = set()
-            for text in texts:
-                if re.search(pattern, text.lower()):
-                    group.add(text)
-            
-            if len(group) > 1:
-                result[representative] = group
+    def _apply_seed_groups(self, texts: List[str]) -> Dict[str, Set[str]]:
+        """Группирует тексты по каноническим названиям из словаря за один проход"""
+        by_name = {}
+        for text in texts:
+            name = self.seed_groups.classify(text)
+            if name is not None:
+                by_name.setdefault(name, set()).add(text)
         
-        return result
+        return {name: group for name, group in by_name.items() if len(group) > 1}
     
     def _group_by_normalized_text(self, texts: List[str]) -> Dict[str, Set[str]]:
         """Группирует тексты, которые становятся идентичными после нормализации"""
         norm_to_orig = {}
         
-        for text in texts:
-            # Базовая нормализация (приведение к нижнему регистру, удаление пунктуации)
-            norm_text = self.text_processor.normalize(text)
-            
+        # Базовая нормализация (приведение к нижнему регистру, удаление пунктуации)
+        normalized_texts = self.text_processor.normalize_many(texts)
+        
+        for text, norm_text in zip(texts, normalized_texts):
             if norm_text not in norm_to_orig:
                 norm_to_orig[norm_text] = set()
             norm_to_orig[norm_text].add(text)
@@ -131,15 +171,25 @@ class SimilarityAnalyzer:
             if self._is_potential_abbreviation(text):
                 abbr_candidates.append(text)
         
+        if not abbr_candidates:
+            return result
+        
+        # Сигнатуры текстов и индексы для поиска расшифровок строятся один раз
+        profiles = [self._abbreviation_profile(text) for text in texts]
+        char_index, edu_bigram_index = self._build_abbreviation_index(profiles)
+        
         # Для каждой потенциальной аббревиатуры ищем соответствующие полные названия
         for abbr in abbr_candidates:
-            abbr_clean = ''.join(c for c in abbr.lower() if c.isalnum())
+            abbr_lower = abbr.lower()
+            abbr_clean = ''.join(c for c in abbr_lower if c.isalnum())
             if len(abbr_clean) < 2:
                 continue
                 
             group = {abbr}
+            word_pattern = re.compile(fr'\b{re.escape(abbr_lower)}\b')
             
-            for full_text in texts:
+            for i in self._abbreviation_candidates(abbr_clean, char_index, edu_bigram_index):
+                full_text = texts[i]
                 if full_text == abbr:
                     continue
                     
@@ -148,7 +198,7 @@ class SimilarityAnalyzer:
                     continue
                 
                 # Проверяем, может ли текст быть расшифровкой аббревиатуры
-                if self._is_expansion_of_abbreviation(full_text, abbr):
+                if self._matches_abbreviation(profiles[i], abbr_clean, word_pattern):
                     group.add(full_text)
             
             # Если нашли группу с более чем одним элементом, добавляем ее в результат
@@ -159,6 +209,59 @@ class SimilarityAnalyzer:
         
         return result
     
+    def _abbreviation_profile(self, text: str) -> Dict[str, object]:
+        """Предвычисляет сигнатуры текста, используемые при сверке с аббревиатурами"""
+        lowered = str(text).lower()
+        words = re.findall(r'\b\w+\b', lowered)
+        significant_words = [w for w in words if w not in self._ABBR_IGNORE_WORDS]
+        return {
+            "text": lowered,
+            "first_letters": ''.join(word[0] for word in words if word),
+            "sig_letters": ''.join(word[0] for word in significant_words),
+            "has_edu_keyword": any(kw in lowered for kw in self._EDU_KEYWORDS)
+        }
+    
+    def _build_abbreviation_index(self, profiles: List[Dict[str, object]]) -> Tuple[Dict[str, Set[int]], Dict[str, Set[int]]]:
+        """Строит индексы для выбора текстов-кандидатов в расшифровки.
+        
+        Первый индекс сопоставляет символу тексты, где он встречается: любая расшифровка
+        по слову, по первым буквам или по последовательным символам содержит все буквы
+        аббревиатуры. Второй индекс — биграммы текстов с образовательными ключевыми словами.
+        """
+        char_index: Dict[str, Set[int]] = {}
+        edu_bigram_index: Dict[str, Set[int]] = {}
+        
+        for i, profile in enumerate(profiles):
+            text = profile["text"]
+            for char in set(text):
+                if char.isalnum():
+                    char_index.setdefault(char, set()).add(i)
+            
+            if profile["has_edu_keyword"]:
+                for pos in range(len(text) - 1):
+                    edu_bigram_index.setdefault(text[pos:pos + 2], set()).add(i)
+        
+        return char_index, edu_bigram_index
+    
+    def _abbreviation_candidates(self, abbr_clean: str, char_index: Dict[str, Set[int]],
+                                 edu_bigram_index: Dict[str, Set[int]]) -> Set[int]:
+        """Возвращает индексы текстов, которые могут оказаться расшифровкой аббревиатуры"""
+        # Пересекаем начиная с самых коротких списков
+        postings = sorted((char_index.get(char, set()) for char in set(abbr_clean)), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:]) if postings else set()
+        
+        # Тексты с образовательными ключевыми словами могут совпасть по 70% биграмм
+        if len(abbr_clean) >= 3:
+            abbr_parts = [abbr_clean[i:i + 2] for i in range(len(abbr_clean) - 1)]
+            matches = {}
+            for part in abbr_parts:
+                for i in edu_bigram_index.get(part, ()):
+                    matches[i] = matches.get(i, 0) + 1
+            min_matches = len(abbr_parts) * 0.7
+            candidates.update(i for i, count in matches.items() if count >= min_matches)
+        
+        return candidates
+    
     def _is_potential_abbreviation(self, text: str) -> bool:
         """Определяет, может ли текст быть аббревиатурой (универсальный алгоритм)"""
         text = str(text).strip()
@@ -203,7 +306,6 @@ class SimilarityAnalyzer:
     
     def _is_expansion_of_abbreviation(self, full_text: str, abbr: str) -> bool:
         """Проверяет, является ли текст расшифровкой аббревиатуры (универсальный алгоритм)"""
-        full_text = str(full_text).lower()
         abbr = str(abbr).lower()
         
         # Очищаем аббревиатуру от не-буквенных символов
@@ -211,31 +313,26 @@ class SimilarityAnalyzer:
         if not abbr_clean:
             return False
         
+        word_pattern = re.compile(fr'\b{re.escape(abbr)}\b')
+        return self._matches_abbreviation(self._abbreviation_profile(full_text), abbr_clean, word_pattern)
+    
+    def _matches_abbreviation(self, profile: Dict[str, object], abbr_clean: str, word_pattern) -> bool:
+        """Сверяет предвычисленные сигнатуры текста с очищенной аббревиатурой"""
+        full_text = profile["text"]
+        
         # Проверка 1: Аббревиатура содержится в тексте как отдельное слово
-        if re.search(fr'\b{re.escape(abbr)}\b', full_text):
+        if word_pattern.search(full_text):
             return True
         
         # Проверка 2: Первые буквы слов в тексте образуют аббревиатуру
-        words = re.findall(r'\b\w+\b', full_text)
-        if words:
-            # Получаем первые буквы всех слов
-            first_letters = ''.join(word[0] for word in words if word)
-            
-            # Проверяем, содержится ли аббревиатура в первых буквах
-            if abbr_clean in first_letters:
+        # (в том числе первые буквы значимых слов, без коротких предлогов и союзов)
+        if profile["first_letters"]:
+            if abbr_clean in profile["first_letters"]:
                 return True
             
-            # Проверяем, содержатся ли первые буквы значимых слов в аббревиатуре
-            # Игнорируем короткие предлоги и союзы
-            ignore_words = {'и', 'в', 'на', 'с', 'по', 'для', 'при', 'им', 'имени', 'of', 'the', 'a', 'an'}
-            significant_words = [w for w in words if w not in ignore_words]
-            
-            if significant_words:
-                sig_letters = ''.join(word[0] for word in significant_words)
-                
-                # Если первые буквы значимых слов совпадают с аббревиатурой
-                if sig_letters == abbr_clean or abbr_clean in sig_letters:
-                    return True
+            sig_letters = profile["sig_letters"]
+            if sig_letters and abbr_clean in sig_letters:
+                return True
         
         # Проверка 3: Последовательные символы аббревиатуры содержатся в тексте
         # Улучшенный алгоритм для поиска последовательных символов
@@ -262,10 +359,7 @@ class SimilarityAnalyzer:
         
         # Проверка 4: Специфичная для образовательных учреждений
         # Проверяем наличие ключевых слов "университет", "институт" и т.д.
-        edu_keywords = {'университет', 'институт', 'академия', 'колледж', 'школа', 'лицей', 'гимназия'}
-        has_edu_keyword = any(kw in full_text for kw in edu_keywords)
-        
-        if has_edu_keyword and len(abbr_clean) >= 3:
+        if profile["has_edu_keyword"] and len(abbr_clean) >= 3:
             # Проверяем, содержит ли полный текст части аббревиатуры
             abbr_parts = []
             for i in range(len(abbr_clean) - 1):
@@ -297,8 +391,8 @@ class SimilarityAnalyzer:
         
         return text
     
-    def _analyze_with_similarity(self, texts: List[str]) -> Dict[str, Set[str]]:
-        """Анализирует тексты с помощью прямого расчета сходства"""
+    def _analyze_with_similarity(self, texts: List[str], engine: Optional[str] = None) -> Dict[str, Set[str]]:
+        """Анализирует тексты с помощью расчета сходства только для пар-кандидатов"""
         if not texts or len(texts) < 2:
             return {}
             
@@ -306,26 +400,11 @@ class SimilarityAnalyzer:
             # Предобработка текстов
             processed_texts = [str(self._preprocess_for_tfidf(t)) for t in texts]
             
-            # Вычисляем матрицу сходства напрямую, без использования TF-IDF
-            n = len(processed_texts)
-            similarity_matrix = np.zeros((n, n), dtype=float)
-            
-            for i in range(n):
-                for j in range(i, n):
-                    # Используем функцию расчета схожести текстов
-                    similarity = float(self._calculate_similarity(processed_texts[i], processed_texts[j]))
-                    similarity_matrix[i, j] = similarity
-                    similarity_matrix[j, i] = similarity
-            
-            # Создаем маску схожести с явной проверкой типов
-            threshold = float(self.similarity_threshold)
-            similarity_mask = np.zeros_like(similarity_matrix, dtype=bool)
-            for i in range(n):
-                for j in range(n):
-                    similarity_mask[i, j] = similarity_matrix[i, j] > threshold
+            # Находим пары схожих текстов выбранным движком
+            edges = self._find_similar_pairs(processed_texts, engine or self.engine)
             
             # Находим компоненты связности
-            components = self._find_connected_components(similarity_mask)
+            components = self._find_connected_components(len(texts), edges)
             
             # Преобразуем компоненты в группы текстов
             result = {}
@@ -343,34 +422,184 @@ class SimilarityAnalyzer:
             print(f"Ошибка при анализе схожести: {e}")
             return {}
     
+    def _find_similar_pairs(self, processed_texts: List[str], engine: str) -> List[Tuple[int, int]]:
+        """Возвращает пары индексов текстов, схожесть которых выше порога"""
+        if engine == "tfidf":
+            return self._tfidf_similar_pairs(processed_texts)
+        
+        if engine == "ngram":
+            return self._ngram_similar_pairs(processed_texts)
+        
+        candidates = self._minhash_candidate_pairs(processed_texts)
+        
+        # Сравниваем только правдоподобные пары вместо полной матрицы n×n
+        threshold = float(self.similarity_threshold)
+        lowered = [str(t).lower() for t in processed_texts]
+        grams = [self._text_ngrams(t) for t in lowered]
+        edges = []
+        for i, j in candidates:
+            similarity = self._similarity(lowered[i], lowered[j], grams[i], grams[j])
+            if similarity > threshold:
+                edges.append((i, j))
+        return edges
+    
+    def _tfidf_matrix(self, processed_texts: List[str]):
+        """Обучает векторизаторы на текстах колонки и возвращает общую разреженную матрицу.
+        
+        Строки символьной и словесной матриц нормированы, поэтому после умножения
+        на корни весов скалярное произведение строк объединенной матрицы равно
+        взвешенной сумме косинусных мер двух представлений.
+        """
+        char_matrix = self.char_vectorizer.fit_transform(processed_texts)
+        try:
+            word_matrix = self.word_vectorizer.fit_transform(processed_texts)
+        except ValueError:
+            # В колонке нет ни одного слова (например, только знаки и одиночные буквы)
+            return char_matrix.tocsr()
+        
+        char_weight = float(self.tfidf_char_weight)
+        return hstack([
+            char_matrix * np.sqrt(char_weight),
+            word_matrix * np.sqrt(1.0 - char_weight)
+        ]).tocsr()
+    
+    def _tfidf_similar_pairs(self, processed_texts: List[str]) -> List[Tuple[int, int]]:
+        """Находит пары с косинусной мерой выше порога блочным разреженным умножением.
+        
+        Матрица сходства строится по блокам строк, и из каждого блока сохраняются
+        только пары выше порога, поэтому память ограничена размером блока.
+        """
+        matrix = self._tfidf_matrix(processed_texts)
+        transposed = matrix.T.tocsr()
+        threshold = float(self.similarity_threshold)
+        block_size = max(int(self.tfidf_block_size), 1)
+        
+        edges = []
+        for start in range(0, matrix.shape[0], block_size):
+            block = (matrix[start:start + block_size] @ transposed).tocoo()
+            rows = block.row + start
+            mask = (block.data > threshold) & (rows < block.col)
+            edges.extend(zip(rows[mask].tolist(), block.col[mask].tolist()))
+        return edges
+    
+    def _text_ngrams(self, text: str) -> Set[str]:
+        """Возвращает множество символьных n-грамм текста"""
+        n = self.ngram_size
+        if len(text) <= n:
+            return {text} if text else set()
+        return {text[i:i + n] for i in range(len(text) - n + 1)}
+    
+    def _ngram_similar_pairs(self, processed_texts: List[str]) -> List[Tuple[int, int]]:
+        """Находит пары со схожестью выше порога через разреженные матрицы n-грамм.
+        
+        Кандидаты — тексты, содержащие n-грамму из префикса самых редких n-грамм другого
+        текста: префикс достаточен, чтобы любые два текста с долей общих n-грамм не ниже
+        порога нашли друг друга, а в текст, содержащий подстроку, входит и весь ее префикс.
+        Пересечения n-грамм считаются умножением матриц по блокам строк, и только пары,
+        где n-граммы одного текста целиком входят в другой, проверяются по самим текстам.
+        """
+        threshold = min(max(float(self.similarity_threshold), 0.0), 1.0)
+        lowered = [str(t).lower() for t in processed_texts]
+        grams = [self._text_ngrams(t) for t in lowered]
+        matrix, prefix = self._ngram_matrices(grams, threshold)
+        sizes = np.diff(matrix.indptr)
+        lengths = np.array([len(t) for t in lowered])
+        prefix_sizes = np.diff(prefix.indptr)
+        transposed = matrix.T.tocsr()
+        block_size = max(int(self.ngram_block_size), 1)
+        
+        edges = set()
+        to_check = set()
+        for start in range(0, len(lowered), block_size):
+            # Мера Жаккара: второй текст содержит n-грамму из префикса первого, размеры
+            # множеств подходят, и n-грамм префикса, которых нет во втором тексте, немного
+            block = (prefix[start:start + block_size] @ transposed).tocoo()
+            block_rows = block.row + start
+            block_cols = block.col
+            rows, cols = block_rows, block_cols
+            smaller = np.minimum(sizes[rows], sizes[cols])
+            missing = prefix_sizes[rows] - block.data
+            mask = (rows < cols) & (smaller >= threshold * np.maximum(sizes[rows], sizes[cols]))
+            mask &= (sizes[rows] - missing) * (1 + threshold) >= threshold * (sizes[rows] + sizes[cols])
+            rows, cols, smaller = rows[mask], cols[mask], smaller[mask]
+            overlap = np.asarray(matrix[rows].multiply(matrix[cols]).sum(axis=1)).ravel()
+            similar = overlap > threshold * (sizes[rows] + sizes[cols] - overlap)
+            # Если n-граммы одного текста входят в другой, текст может быть вложен — тогда мера другая
+            subset = overlap == smaller
+            edges.update(zip(rows[similar & ~subset].tolist(), cols[similar & ~subset].tolist()))
+            to_check.update(zip(rows[similar & subset].tolist(), cols[similar & subset].tolist()))
+            
+            # Вложение: объемлющий текст содержит весь префикс вложенного
+            # и не настолько длиннее, чтобы доля длины упала ниже порога
+            rows, cols = block_rows, block_cols
+            mask = (rows != cols) & (block.data == prefix_sizes[rows])
+            mask &= (lengths[cols] >= lengths[rows]) & (lengths[cols] * threshold < lengths[rows])
+            rows, cols = rows[mask], cols[mask]
+            # Подстрока обязательно содержит только n-граммы объемлющего текста
+            overlap = np.asarray(matrix[rows].multiply(matrix[cols]).sum(axis=1)).ravel()
+            rows, cols = rows[overlap == sizes[rows]], cols[overlap == sizes[rows]]
+            to_check.update(zip(np.minimum(rows, cols).tolist(), np.maximum(rows, cols).tolist()))
+        
+        # Текст короче n-граммы может входить только в тексты короче n / порог — их немного
+        n = self.ngram_size
+        max_short_length = n / threshold if threshold > 0 else float("inf")
+        nearby = np.flatnonzero(lengths < max_short_length)
+        for i in np.flatnonzero((lengths > 0) & (lengths < n)).tolist():
+            for j in nearby[(lengths[nearby] >= lengths[i]) & (lengths[nearby] * threshold < lengths[i])].tolist():
+                if j != i:
+                    to_check.add((i, j) if i < j else (j, i))
+        
+        for i, j in to_check - edges:
+            if self._similarity(lowered[i], lowered[j], grams[i], grams[j]) > threshold:
+                edges.add((i, j))
+        return list(edges)
+    
+    def _ngram_matrices(self, grams: List[Set[str]], threshold: float):
+        """Бинарные матрицы "текст × n-грамма": все n-граммы текстов и их префиксы.
+        
+        n-граммы каждого текста упорядочиваются от редких к частым по документной частоте;
+        в префикс попадает столько n-грамм, сколько нужно для префиксной фильтрации по порогу.
+        """
+        frequency = {}
+        for gram_set in grams:
+            for gram in gram_set:
+                frequency[gram] = frequency.get(gram, 0) + 1
+        vocabulary = {gram: idx for idx, gram in enumerate(frequency)}
+        
+        indices, prefix_indices = [], []
+        indptr, prefix_indptr = [0], [0]
+        for gram_set in grams:
+            ordered = [vocabulary[g] for g in sorted(gram_set, key=lambda g: (frequency[g], g))]
+            prefix_length = len(ordered) - int(np.ceil(threshold * len(ordered))) + 1
+            indices.extend(ordered)
+            prefix_indices.extend(ordered[:max(prefix_length, 1)])
+            indptr.append(len(indices))
+            prefix_indptr.append(len(prefix_indices))
+        
+        shape = (len(grams), len(vocabulary))
+        matrices = []
+        for idx, ptr in ((indices, indptr), (prefix_indices, prefix_indptr)):
+            matrix = csr_matrix((np.ones(len(idx), dtype=np.int32), idx, ptr), shape=shape)
+            # Поэлементное умножение быстрее на отсортированных индексах
+            matrix.sort_indices()
+            matrices.append(matrix)
+        return tuple(matrices)
+    
     def _merge_overlapping_groups(self, groups: List[Tuple[str, Set[str]]]) -> Dict[str, Set[str]]:
         """Объединяет пересекающиеся группы"""
         if not groups:
             return {}
             
-        # Создаем граф связей между группами
-        n = len(groups)
-        adjacency_matrix = np.zeros((n, n), dtype=bool)
-        
-        for i in range(n):
-            for j in range(i+1, n):
-                _, group_i = groups[i]
-                _, group_j = groups[j]
-                
-                # Если группы пересекаются, добавляем связь
-                if group_i.intersection(group_j):
-                    adjacency_matrix[i, j] = True
-                    adjacency_matrix[j, i] = True
+        # Группы, содержащие одно и то же значение, попадают в одно множество
+        disjoint_set = DisjointSet(len(groups))
+        value_owner = {}
+        for idx, (_, group) in enumerate(groups):
+            for value in group:
+                owner = value_owner.setdefault(value, idx)
+                if owner != idx:
+                    disjoint_set.union(owner, idx)
         
-        # Находим компоненты связности в графе групп
-        visited = [False] * n
-        merged_components = []
-        
-        for i in range(n):
-            if not visited[i]:
-                component = []
-                self._dfs(adjacency_matrix, i, visited, component)
-                merged_components.append(component)
+        merged_components = list(disjoint_set.groups().values())
         
         # Объединяем группы в каждой компоненте
         result = {}
@@ -389,28 +618,78 @@ class SimilarityAnalyzer:
         
         return result
     
-    def _find_connected_components(self, adjacency_matrix):
-        """Находит связные компоненты в графе схожести"""
-        n = adjacency_matrix.shape[0]
-        visited = [False] * n
-        components = []
-        
-        for i in range(n):
-            if not visited[i]:
-                component = []
-                self._dfs(adjacency_matrix, i, visited, component)
-                components.append(component)
-                
-        return components
+    def _minhash_signatures(self, texts: List[str]) -> np.ndarray:
+        """Вычисляет MinHash-сигнатуры множеств символьных n-грамм.
+        
+        Используются хеш-функции вида (a * x + b) mod p с фиксированным зерном,
+        поэтому сигнатуры воспроизводимы между запусками. Тексты обрабатываются
+        пачками, чтобы промежуточная матрица хешей оставалась небольшой.
+        """
+        num_hashes = self.minhash_bands * self.minhash_rows
+        rng = np.random.default_rng(0)
+        prime = self._MINHASH_PRIME
+        # Коэффициенты ограничены 2^31, а значения n-грамм 2^32, чтобы a * x не переполнял uint64
+        a = rng.integers(1, 1 << 31, size=num_hashes, dtype=np.uint64)
+        b = rng.integers(0, 1 << 31, size=num_hashes, dtype=np.uint64)
+        
+        signatures = np.full((len(texts), num_hashes), np.iinfo(np.uint64).max, dtype=np.uint64)
+        # Не более ~4 млн значений хешей (около 32 МБ) в одной пачке
+        chunk_grams = max(4_000_000 // max(num_hashes, 1), 1)
+        
+        start = 0
+        while start < len(texts):
+            ids, offsets, rows = [], [], []
+            end = start
+            while end < len(texts) and len(ids) < chunk_grams:
+                grams = self._text_ngrams(texts[end])
+                if grams:
+                    offsets.append(len(ids))
+                    rows.append(end)
+                    ids.extend(zlib.crc32(g.encode("utf-8")) for g in grams)
+                end += 1
+            
+            if ids:
+                values = np.asarray(ids, dtype=np.uint64)
+                hashes = (a[:, None] * values[None, :] + b[:, None]) % np.uint64(prime)
+                signatures[rows] = np.minimum.reduceat(hashes, offsets, axis=1).T
+            start = end
+        
+        return signatures
+    
+    def _minhash_candidate_pairs(self, texts: List[str]) -> Set[Tuple[int, int]]:
+        """Формирует пары-кандидаты через LSH по полосам MinHash-сигнатур"""
+        signatures = self._minhash_signatures(texts)
+        rows = self.minhash_rows
+        has_grams = [bool(t) for t in texts]
+        
+        candidates = set()
+        for band in range(self.minhash_bands):
+            buckets: Dict[bytes, List[int]] = {}
+            band_values = signatures[:, band * rows:(band + 1) * rows]
+            for i in range(len(texts)):
+                if has_grams[i]:
+                    buckets.setdefault(band_values[i].tobytes(), []).append(i)
+            
+            for members in buckets.values():
+                if len(members) < 2:
+                    continue
+                if len(members) > self.minhash_max_bucket:
+                    # Большая корзина: ограничиваемся линейным числом пар
+                    first = members[0]
+                    candidates.update((first, j) for j in members[1:])
+                    continue
+                for pos, i in enumerate(members):
+                    for j in members[pos + 1:]:
+                        candidates.add((i, j))
+        
+        return candidates
     
-    def _dfs(self, adjacency_matrix, node, visited, component):
-        """Обход графа в глубину для поиска связных компонент"""
-        visited[node] = True
-        component.append(node)
-        
-        for neighbor in range(adjacency_matrix.shape[0]):
-            if adjacency_matrix[node, neighbor] and not visited[neighbor]:
-                self._dfs(adjacency_matrix, neighbor, visited, component)
+    def _find_connected_components(self, n: int, edges: List[Tuple[int, int]]) -> List[List[int]]:
+        """Находит связные компоненты в графе схожести, заданном списком ребер"""
+        disjoint_set = DisjointSet(n)
+        for i, j in edges:
+            disjoint_set.union(i, j)
+        return list(disjoint_set.groups().values())
     
     def _select_representative(self, texts: Set[str]) -> str:
         """Выбирает представителя группы по универсальным критериям"""
@@ -419,10 +698,10 @@ class SimilarityAnalyzer:
         if len(texts) == 1:
             return next(iter(texts))
         
-        # Проверяем, совпадает ли какой-либо текст с названиями университетов
-        for full_name in self.university_patterns.values():
-            if full_name in texts:
-                return full_name
+        # Проверяем, совпадает ли какой-либо текст с каноническими названиями из словаря
+        canonical = [t for t in texts if t in self.seed_groups.name_order]
+        if canonical:
+            return min(canonical, key=self.seed_groups.name_order.get)
         
         # Преобразуем в список для удобства
         texts_list = list(texts)
@@ -439,7 +718,7 @@ class SimilarityAnalyzer:
         clean_scores = [sum(1 for c in t if c.isalpha() or c.isspace()) / max(1, len(t)) for t in texts_list]
         
         # Критерий 4: Предпочитаем тексты, которые являются "центральными" в группе
-        centrality_scores = [self._calculate_centrality(t, texts) for t in texts_list]
+        centrality_scores = self._calculate_centrality(texts_list)
         
         # Комбинируем все критерии с разными весами
         combined_scores = [
@@ -454,26 +733,36 @@ class SimilarityAnalyzer:
         best_idx = combined_scores.index(max(combined_scores))
         return texts_list[best_idx]
     
-    def _calculate_centrality(self, text: str, all_texts: Set[str]) -> float:
-        """Вычисляет, насколько текст похож на все остальные тексты в группе"""
-        if len(all_texts) <= 1:
-            return 1.0
-            
-        similarities = []
-        for other in all_texts:
-            if other == text:
-                continue
-                
-            similarity = self._calculate_similarity(text, other)
-            similarities.append(similarity)
-            
-        return sum(similarities) / len(similarities) if similarities else 0.0
+    def _calculate_centrality(self, texts: List[str]) -> List[float]:
+        """Оценивает, насколько каждый текст похож на остальные тексты группы.
+        
+        Вместо сравнения всех пар (квадратичного по размеру группы) считается,
+        в какой доле остальных текстов в среднем встречаются n-граммы текста.
+        """
+        if len(texts) <= 1:
+            return [1.0] * len(texts)
+        
+        grams = [self._text_ngrams(str(t).lower()) for t in texts]
+        counts = {}
+        for gram_set in grams:
+            for gram in gram_set:
+                counts[gram] = counts.get(gram, 0) + 1
+        
+        others = len(texts) - 1
+        return [
+            sum(counts[g] - 1 for g in gram_set) / (len(gram_set) * others) if gram_set else 0.0
+            for gram_set in grams
+        ]
     
     def _calculate_similarity(self, text1: str, text2: str) -> float:
         """Вычисляет схожесть двух текстов"""
         text1 = str(text1).lower()
         text2 = str(text2).lower()
-        
+        return self._similarity(text1, text2, self._text_ngrams(text1), self._text_ngrams(text2))
+    
+    @staticmethod
+    def _similarity(text1: str, text2: str, grams1: Set[str], grams2: Set[str]) -> float:
+        """Схожесть текстов в нижнем регистре по их множествам символьных n-грамм"""
         # Если тексты идентичны
         if text1 == text2:
             return 1.0
@@ -484,11 +773,8 @@ class SimilarityAnalyzer:
             longer = text2 if len(text1) < len(text2) else text1
             return len(shorter) / len(longer)
         
-        # Иначе используем схожесть множеств символов
-        set1 = set(text1)
-        set2 = set(text2)
-        
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
+        # Иначе используем меру Жаккара по n-граммам
+        intersection = len(grams1 & grams2)
+        union = len(grams1 | grams2)
         
-        return intersection / union if union > 0 else 0.0
\ No newline at end of file
+        return intersection / union if union > 0 else 0.0
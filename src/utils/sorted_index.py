@@ -0,0 +1,72 @@
+from typing import Optional
+import numpy as np
+from utils.range_query import RangeQuery
+
+class SortedIndex:
+    """Типизированный массив значений колонки (float или datetime64) с отсортированным индексом.
+
+    Пустые и неразобранные значения хранятся как NaN/NaT и ни одному условию не удовлетворяют.
+    Перестановка сортировки строится при первом запросе и сбрасывается при правках.
+    """
+
+    def __init__(self, values: np.ndarray):
+        values = np.asarray(values)
+        if values.dtype.kind != "M":
+            values = values.astype(float)
+        self.values = values
+        self._missing_value = np.datetime64("NaT") if values.dtype.kind == "M" else np.nan
+        self._order: Optional[np.ndarray] = None
+        self._sorted: Optional[np.ndarray] = None
+
+    def query(self, query: RangeQuery) -> np.ndarray:
+        """Возвращает отсортированные позиции строк, удовлетворяющих условию"""
+        order, sorted_values = self._get_sorted()
+        if query.values is not None:
+            targets = np.unique(self._convert(query.values))
+            starts = np.searchsorted(sorted_values, targets, side="left")
+            ends = np.searchsorted(sorted_values, targets, side="right")
+            rows = [order[start:end] for start, end in zip(starts, ends) if end > start]
+            return np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+        start, end = 0, len(sorted_values)
+        if query.low is not None:
+            low = self._convert([query.low])[0]
+            start = np.searchsorted(sorted_values, low, side="left" if query.low_inclusive else "right")
+        if query.high is not None:
+            high = self._convert([query.high])[0]
+            end = np.searchsorted(sorted_values, high, side="right" if query.high_inclusive else "left")
+        if end <= start:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(order[start:end])
+
+    def set_value(self, position: int, value) -> None:
+        self.values[position] = self._missing_value if value is None else value
+        self._reset()
+
+    def append(self, value) -> None:
+        self.values = np.append(self.values, self._convert([self._missing_value if value is None else value]))
+        self._reset()
+
+    def delete(self, position: int) -> None:
+        self.values = np.delete(self.values, position)
+        self._reset()
+
+    def _convert(self, values) -> np.ndarray:
+        return np.asarray(values, dtype=self.values.dtype)
+
+    def _missing(self) -> np.ndarray:
+        if self.values.dtype.kind == "M":
+            return np.isnat(self.values)
+        return np.isnan(self.values)
+
+    def _get_sorted(self):
+        if self._order is None:
+            # Пропуски отбрасываются: они не участвуют ни в одном сравнении
+            valid = np.flatnonzero(~self._missing())
+            self._order = valid[np.argsort(self.values[valid], kind="stable")]
+            self._sorted = self.values[self._order]
+        return self._order, self._sorted
+
+    def _reset(self) -> None:
+        self._order = None
+        self._sorted = None
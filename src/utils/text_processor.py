@@ -1,61 +1,121 @@
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import pandas as pd
 
 class TextProcessor:
+    # Скобки с содержимым
+    _PARENS_RE = re.compile(r'\([^)]*\)')
+    
+    # Номера с # или № и стандартные сокращения — одним проходом
+    _ABBREVIATIONS = {'им': 'имени ', 'г': 'город ', 'ул': 'улица ', 'пр': 'проспект '}
+    _NUMBERS_AND_ABBR_RE = re.compile(r'[#№]\s*(\d+)|\b(им|г|ул|пр)\.\s+')
+    
+    # Любая последовательность не-словесных символов (пунктуация, кавычки, тире, пробелы)
+    _NON_WORD_RE = re.compile(r'\W+')
+    
+    # Префиксы организаций
+    _ORG_PREFIXES = ('уо ', 'го ', 'гуо ', 'оо ')
+    
+    # Максимальное число различных строк в общем кэше нормализации
+    NORMALIZE_CACHE_SIZE = 200_000
+    
+    @staticmethod
+    def _replace_number_or_abbreviation(match: re.Match) -> str:
+        if match.group(1) is not None:
+            return f"номер {match.group(1)}"
+        return TextProcessor._ABBREVIATIONS[match.group(2)]
+    
     @staticmethod
     def normalize(text: str) -> str:
         """
         Улучшенная нормализация текста для более точного сравнения
+        (результат берется из общего кэша)
+        """
+        return TextProcessor._normalized_entry(str(text))[0]
+    
+    @staticmethod
+    @lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+    def _normalized_entry(text: str) -> Tuple[str, Tuple[str, ...]]:
+        """Нормализованная форма строки и ее слова; кэшируется для всех экземпляров"""
+        normalized = TextProcessor._normalize_uncached(text)
+        return normalized, tuple(normalized.split())
+    
+    @staticmethod
+    def _normalize_uncached(text: str) -> str:
+        """
+        Выполняет нормализацию без кэша
+        
+        Кавычки и тире не унифицируются отдельно: как и вся прочая пунктуация,
+        они заменяются пробелом на последнем проходе, поэтому результат тот же.
         """
         # Приводим к строке и нижнему регистру
         text = str(text).lower()
         
-        # Заменяем различные типы кавычек на стандартные
-        text = re.sub(r'[«»""\']', '"', text)
-        
-        # Заменяем различные типы тире на стандартное
-        text = re.sub(r'[–—−]', '-', text)
-        
-        # Заменяем различные типы пробелов на стандартные
-        text = re.sub(r'\s+', ' ', text)
-        
         # Удаляем скобки с их содержимым
-        text = re.sub(r'\([^)]*\)', '', text)
+        if '(' in text:
+            text = TextProcessor._PARENS_RE.sub('', text)
         
-        # Заменяем числа с # или № на стандартную форму
-        text = re.sub(r'[#№](\s*)(\d+)', r'номер \2', text)
-        
-        # Стандартизируем сокращения
-        text = re.sub(r'\bим\.\s+', 'имени ', text)
-        text = re.sub(r'\bг\.\s+', 'город ', text)
-        text = re.sub(r'\bул\.\s+', 'улица ', text)
-        text = re.sub(r'\bпр\.\s+', 'проспект ', text)
+        # Заменяем числа с # или № на стандартную форму и стандартизируем сокращения
+        if '.' in text or '#' in text or '№' in text:
+            text = TextProcessor._NUMBERS_AND_ABBR_RE.sub(TextProcessor._replace_number_or_abbreviation, text)
         
         # Удаляем пунктуацию и лишние пробелы
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = TextProcessor._NON_WORD_RE.sub(' ', text).strip()
         
         # Удаляем префиксы организаций
-        text = re.sub(r'^(уо|го|гуо|оо)\s+', '', text)
+        if text.startswith(TextProcessor._ORG_PREFIXES):
+            text = text[text.index(' ') + 1:]
         
         return text
+    
+    @staticmethod
+    def normalize_many(texts: Union[pd.Series, Iterable[str]]) -> Union[pd.Series, List[str]]:
+        """
+        Нормализует набор текстов; повторяющиеся значения обрабатываются один раз.
+        Для pandas Series возвращает Series с тем же индексом, иначе — список.
+        """
+        if isinstance(texts, pd.Series):
+            mapping = {value: TextProcessor.normalize(value) for value in texts.unique()}
+            return texts.map(mapping)
+        
+        mapping = {}
+        result = []
+        for text in texts:
+            normalized = mapping.get(text)
+            if normalized is None:
+                normalized = mapping[text] = TextProcessor.normalize(text)
+            result.append(normalized)
+        return result
 
     @staticmethod
     def extract_keywords(text: str, min_length: int = 3) -> List[str]:
         """
         Извлекает ключевые слова из текста
         """
-        normalized = TextProcessor.normalize(text)
-        words = re.findall(r'\b\w+\b', normalized)
+        # Нормализованный текст состоит только из слов, разделенных одиночными пробелами
+        words = TextProcessor._normalized_entry(str(text))[1]
         return [w for w in words if len(w) >= min_length]
 
+    @staticmethod
+    def cache_stats() -> Dict[str, int]:
+        """Статистика общего кэша нормализации: попадания, промахи и заполненность"""
+        info = TextProcessor._normalized_entry.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    @staticmethod
+    def clear_cache() -> None:
+        """Очищает общий кэш нормализации"""
+        TextProcessor._normalized_entry.cache_clear()
+
     @staticmethod
     def find_num_column(columns: List[str]) -> Optional[int]:
         """
         Находит индекс колонки с номерами
         """
         num_col_names = ["excel #", "№", "номер строки", "номер", "номер_строки", ""]
+        normalized_names = set(TextProcessor.normalize_many(num_col_names))
         for i, col in enumerate(columns):
-            if TextProcessor.normalize(str(col)) in [TextProcessor.normalize(n) for n in num_col_names]:
+            if TextProcessor.normalize(str(col)) in normalized_names:
                 return i
         return None
\ No newline at end of file
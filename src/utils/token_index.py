@@ -0,0 +1,122 @@
+import bisect
+from typing import Dict, Iterable, List, Optional, Set
+import numpy as np
+import pandas as pd
+
+class TokenIndex:
+    """Инвертированный индекс слов нормализованной колонки.
+
+    Строки с одинаковым нормализованным значением объединяются под одним кодом значения.
+    Для каждого слова хранится список кодов значений, для каждого кода — отсортированные
+    позиции строк: все позиции лежат в одном массиве по порядку кодов (как в CSR),
+    границы кодов хранятся отдельно, поэтому сдвиг позиций при удалении — одна операция. Ключевое слово ищется как подстрока в словаре
+    всех слов, поэтому результат совпадает с проверкой `kw in normalized`.
+    """
+
+    def __init__(self, normalized: pd.Series):
+        # Для категориальных колонок factorize работает по кодам, не перебирая строки
+        codes, uniques = pd.factorize(normalized, sort=False)
+        self.value_codes: Dict[str, int] = {value: code for code, value in enumerate(uniques)}
+
+        # Позиции строк по кодам значений (стабильная сортировка сохраняет порядок строк)
+        self.positions: np.ndarray = np.argsort(codes, kind="stable").astype(np.int64)
+        self.offsets: np.ndarray = np.concatenate(
+            ([0], np.cumsum(np.bincount(codes, minlength=len(uniques))))).astype(np.int64)
+
+        postings: Dict[str, List[int]] = {}
+        for code, value in enumerate(uniques):
+            for token in set(value.split()):
+                postings.setdefault(token, []).append(code)
+        self.postings: Dict[str, List[int]] = postings
+
+        self._vocabulary: Optional[str] = None
+        self._vocabulary_tokens: List[str] = []
+        self._vocabulary_offsets: List[int] = []
+
+    def search(self, keywords: Iterable[str]) -> np.ndarray:
+        """Возвращает отсортированные позиции строк, содержащих все ключевые слова"""
+        matched: Optional[Set[int]] = None
+        for kw in sorted(set(keywords), key=len, reverse=True):
+            codes = self._codes_for_keyword(kw)
+            matched = codes if matched is None else matched & codes
+            if not matched:
+                return np.empty(0, dtype=np.int64)
+
+        if matched is None:
+            return np.empty(0, dtype=np.int64)
+        rows = [self._rows(code) for code in matched]
+        return np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    def add_row(self, position: int, value: str) -> None:
+        """Добавляет строку; позиция должна быть больше всех существующих"""
+        code = self._code_for_value(value)
+        self._insert(code, self.offsets[code + 1], position)
+
+    def update_row(self, position: int, old_value: str, new_value: str) -> None:
+        """Переносит строку от старого нормализованного значения к новому"""
+        old_code = self.value_codes.get(old_value)
+        if old_code is not None:
+            self._remove(old_code, position)
+        code = self._code_for_value(new_value)
+        rows = self._rows(code)
+        self._insert(code, self.offsets[code] + np.searchsorted(rows, position), position)
+
+    def delete_row(self, position: int, value: str) -> None:
+        """Удаляет строку; позиции последующих строк уменьшаются на единицу"""
+        code = self.value_codes.get(value)
+        if code is not None:
+            self._remove(code, position)
+        self.positions -= self.positions > position
+
+    def _rows(self, code: int) -> np.ndarray:
+        return self.positions[self.offsets[code]:self.offsets[code + 1]]
+
+    def _insert(self, code: int, at: int, position: int) -> None:
+        self.positions = np.insert(self.positions, at, position)
+        self.offsets[code + 1:] += 1
+
+    def _remove(self, code: int, position: int) -> None:
+        found = np.flatnonzero(self._rows(code) == position)
+        if len(found):
+            self.positions = np.delete(self.positions, self.offsets[code] + found[0])
+            self.offsets[code + 1:] -= 1
+
+    def _code_for_value(self, value: str) -> int:
+        code = self.value_codes.get(value)
+        if code is None:
+            code = len(self.offsets) - 1
+            self.value_codes[value] = code
+            self.offsets = np.append(self.offsets, self.offsets[-1])
+            for token in set(value.split()):
+                if token not in self.postings:
+                    self._vocabulary = None
+                self.postings.setdefault(token, []).append(code)
+        return code
+
+    def _codes_for_keyword(self, kw: str) -> Set[int]:
+        """Коды значений, в словах которых ключевое слово встречается как подстрока"""
+        codes: Set[int] = set()
+
+        # Просматриваем словарь одной строкой: поиск подстроки выполняется на уровне C
+        vocabulary = self._get_vocabulary()
+        offsets = self._vocabulary_offsets
+        pos = vocabulary.find(kw)
+        while pos >= 0:
+            token_idx = bisect.bisect_right(offsets, pos) - 1
+            codes.update(self.postings[self._vocabulary_tokens[token_idx]])
+            # Продолжаем со следующего слова: совпадения внутри текущего уже учтены
+            if token_idx + 1 >= len(offsets):
+                break
+            pos = vocabulary.find(kw, offsets[token_idx + 1])
+        return codes
+
+    def _get_vocabulary(self) -> str:
+        if self._vocabulary is None:
+            self._vocabulary_tokens = list(self.postings)
+            self._vocabulary_offsets = []
+            offset = 0
+            for token in self._vocabulary_tokens:
+                self._vocabulary_offsets.append(offset)
+                offset += len(token) + 1
+            self._vocabulary = "\n".join(self._vocabulary_tokens)
+        return self._vocabulary